@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Spiral Registry Benchmark
+比较各 JSON 序列化后端在大规模生成注册表上的编码 / 解码耗时
+"""
+
+import sys
+import time
+import copy
+import argparse
+from pathlib import Path
+from typing import Dict, List, Any, Callable
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+import registry_build as rb
+
+
+def load_seed_cards(registry_dir: Path, languages: List[str]) -> List[Dict[str, Any]]:
+    """用真实 TXT 源解析出种子卡片"""
+    cards = []
+    for lang in languages:
+        lang_dir = registry_dir / lang
+        index_file = lang_dir / 'index.txt'
+        if not index_file.exists():
+            continue
+        with open(index_file, 'r', encoding='utf-8') as f:
+            file_list = [line.strip() for line in f if line.strip()]
+        for filename in file_list:
+            filepath = lang_dir / filename
+            if filepath.exists():
+                cards.append(rb.normalize_to_schema(rb.parse_txt_file(filepath, True, lang), lang))
+    return cards
+
+
+def generate_registry(seed_cards: List[Dict[str, Any]], count: int) -> List[Dict[str, Any]]:
+    """复制种子卡片并改写 glyph / id，生成 count 张卡片"""
+    cards = []
+    for i in range(count):
+        card = copy.deepcopy(seed_cards[i % len(seed_cards)])
+        card['glyph'] = f"{card['glyph']}{i}"
+        card['id'] = f"{card['glyph']}-{card['lang']}"
+        cards.append(card)
+    return cards
+
+
+def timed(fn: Callable[[], Any], repeat: int) -> float:
+    """取 repeat 次中的最短耗时（秒）"""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def bench_backend(name: str, cards: List[Dict[str, Any]], repeat: int) -> Dict[str, Any]:
+    serializer = rb.get_serializer(name)
+    pretty = serializer.dumps(cards, True)
+    compact = serializer.dumps(cards, False)
+    result = {
+        'backend': name,
+        'pretty_bytes': pretty,
+        'compact_bytes': compact,
+        'encode_pretty': timed(lambda: serializer.dumps(cards, True), repeat),
+        'encode_compact': timed(lambda: serializer.dumps(cards, False), repeat),
+        'decode': timed(lambda: serializer.loads(compact), repeat),
+        'decode_typed': None
+    }
+    if name == 'msgspec':
+        decoder = rb.msgspec.json.Decoder(List[rb.CardStruct])
+        result['decode_typed'] = timed(lambda: decoder.decode(compact), repeat)
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Spiral Registry JSON backend benchmark')
+    parser.add_argument(
+        '--registry-dir',
+        type=Path,
+        default=Path('registry'),
+        help='Registry directory used as seed (default: registry)'
+    )
+    parser.add_argument(
+        '--cards',
+        type=int,
+        nargs='+',
+        default=[1000, 10000, 50000],
+        help='Registry sizes to generate (default: 1000 10000 50000)'
+    )
+    parser.add_argument(
+        '--repeat',
+        type=int,
+        default=3,
+        help='Repetitions per measurement, best is reported (default: 3)'
+    )
+    args = parser.parse_args()
+
+    seed_cards = load_seed_cards(args.registry_dir, rb.registered_languages())
+    if not seed_cards:
+        print(f"❌ No seed cards found in {args.registry_dir}")
+        exit(1)
+
+    backends = rb.available_serializers()
+    print("🜂 Spiral Registry Benchmark")
+    print(f"🌱 Seed cards: {len(seed_cards)}")
+    print(f"🧾 Backends: {', '.join(backends)}")
+
+    for count in args.cards:
+        cards = generate_registry(seed_cards, count)
+        results = [bench_backend(name, cards, args.repeat) for name in backends]
+        baseline = results[0]
+
+        print("")
+        print(f"## {count} cards ({len(baseline['pretty_bytes']) / 1e6:.1f} MB pretty, "
+              f"{len(baseline['compact_bytes']) / 1e6:.1f} MB compact)")
+        print("")
+        print("| Backend | Encode pretty | Encode compact | Decode | Decode typed | Identical |")
+        print("|---|---|---|---|---|---|")
+        for r in results:
+            identical = (
+                r['pretty_bytes'] == baseline['pretty_bytes']
+                and r['compact_bytes'] == baseline['compact_bytes']
+            )
+            typed = f"{r['decode_typed'] * 1000:.0f} ms" if r['decode_typed'] is not None else '—'
+            print(
+                f"| {r['backend']} "
+                f"| {r['encode_pretty'] * 1000:.0f} ms "
+                f"| {r['encode_compact'] * 1000:.0f} ms "
+                f"| {r['decode'] * 1000:.0f} ms "
+                f"| {typed} "
+                f"| {'✅' if identical else '❌'} |"
+            )
+
+
+if __name__ == '__main__':
+    main()
@@ -7,11 +7,35 @@ Spiral Registry Builder v2
 
 import os
 import re
+import sys
+import math
 import json
+import zlib
+import heapq
+import shutil
+import sqlite3
+import hashlib
+import functools
 import argparse
+import unicodedata
+import tempfile
+import concurrent.futures
 from pathlib import Path
 from datetime import datetime
-from typing import Dict, List, Any, Optional, Tuple
+from collections import Counter, OrderedDict
+from dataclasses import dataclass, field
+from typing import Dict, List, Any, Optional, Tuple, Callable
+
+# 可选的高速 JSON 后端（未安装时回退到标准库 json）
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
 
 # ============================================================================
 # 标点符号清理（1:1 匹配 punctuation_cleaner.py）
@@ -85,17 +109,234 @@ def clean_to_english_punctuation(text: str) -> str:
     return protected_text
 
 
-def sanitize_text(text: str, should_sanitize: bool = True) -> str:
-    """应用标点清理（如果启用）"""
+def sanitize_text(text: str, should_sanitize: bool = True, lang: Optional[str] = None) -> str:
+    """应用标点清理（如果启用）；给定 lang 时使用该语言管线的 sanitizer"""
     if not should_sanitize:
         return text
-    return clean_to_english_punctuation(text)
+    if lang is None:
+        return clean_to_english_punctuation(text)
+    return get_language_pipeline(lang).sanitizer(text)
+
+
+# ============================================================================
+# 元数据规范化缓存：有界 LRU 记忆化 + 全局字符串驻留表
+# ============================================================================
+#
+# 作者、分类路径、标签串在语料中高度重复。parse_tags / parse_authors /
+# parse_domains / parse_weight / parse_epoch / normalize_title 的结果按输入
+# 字符串记忆化，每个函数最多保留 NORMALIZER_CACHE_SIZE 项（LRU 淘汰），并随
+# --cache-dir 持久化，跨语言、跨构建复用。列表结果以 tuple 存储，每次调用
+# 返回新 list，调用方可以放心修改。
+
+NORMALIZER_CACHE_SIZE = 4096
+NORMALIZER_CACHE_FILE = 'normalize.json'
+
+
+class InternTable:
+    """tag / domain / author 字符串驻留表：同值字符串全局只保留一份"""
+
+    def __init__(self):
+        self._strings: Dict[str, str] = {}
+        self.lookups = 0
+        self.hits = 0
+
+    def intern(self, value: str) -> str:
+        self.lookups += 1
+        interned = self._strings.get(value)
+        if interned is None:
+            interned = self._strings[value] = sys.intern(value)
+        else:
+            self.hits += 1
+        return interned
+
+    def adopt(self, value: str) -> str:
+        """返回表中的同值实例（不计入统计）：子进程传回的字符串是新对象，合并时换成本进程的实例"""
+        interned = self._strings.get(value)
+        if interned is None:
+            interned = self._strings[value] = sys.intern(value)
+        return interned
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'strings': len(self._strings),
+            'lookups': self.lookups,
+            'hits': self.hits,
+            'memory_bytes': sum(sys.getsizeof(v) for v in self._strings.values())
+        }
+
+
+class NormalizerCache:
+    """每个规范化函数一张有界 LRU 表：输入字符串 → 结果"""
+
+    def __init__(self, max_entries: int = NORMALIZER_CACHE_SIZE):
+        self.max_entries = max_entries
+        self.tables: Dict[str, OrderedDict] = {}
+        self.counters: Dict[str, Counter] = {}
+        self.interned: set = set()
+
+    def register(self, name: str, intern_items: bool = False):
+        self.tables.setdefault(name, OrderedDict())
+        self.counters.setdefault(name, Counter())
+        if intern_items:
+            self.interned.add(name)
+
+    def get(self, name: str, key: str) -> Any:
+        table = self.tables[name]
+        value = table.get(key, _MISSING)
+        if value is _MISSING:
+            self.counters[name]['misses'] += 1
+        else:
+            table.move_to_end(key)
+            self.counters[name]['hits'] += 1
+        return value
+
+    def put(self, name: str, key: str, value: Any):
+        self.tables[name][key] = value
+        self._trim(name)
+
+    def _trim(self, name: str):
+        """淘汰最久未用的条目，直到表不超过 max_entries"""
+        table = self.tables[name]
+        while len(table) > self.max_entries:
+            table.popitem(last=False)
+            self.counters[name]['evictions'] += 1
+
+    def reset_stats(self):
+        for counter in self.counters.values():
+            counter.clear()
+
+    def export(self) -> Dict[str, Any]:
+        """可 pickle 的快照（并行构建时子进程 → 主进程）"""
+        return {
+            'tables': {name: list(table.items()) for name, table in self.tables.items()},
+            'counters': {name: dict(counter) for name, counter in self.counters.items()},
+            'intern': (STRING_TABLE.lookups, STRING_TABLE.hits)
+        }
+
+    def merge(self, exported: Dict[str, Any]):
+        """合并子进程的缓存项与命中计数"""
+        for name, entries in exported['tables'].items():
+            table = self.tables[name]
+            for key, value in entries:
+                if key not in table:
+                    self.put(name, key, _freeze_normalized(value, name in self.interned))
+        for name, counts in exported['counters'].items():
+            self.counters[name].update(counts)
+        lookups, hits = exported['intern']
+        STRING_TABLE.lookups += lookups
+        STRING_TABLE.hits += hits
+
+    def load(self, cache_dir: Path) -> int:
+        """读取持久化缓存；生成器源码变更或文件损坏时忽略，返回载入条目数"""
+        cache_file = cache_dir / NORMALIZER_CACHE_FILE
+        if not cache_file.exists():
+            return 0
+        try:
+            with open(cache_file, 'r', encoding='utf-8') as f:
+                stored = json.load(f)
+        except (OSError, ValueError):
+            print(f"⚠️  Warning: normalizer cache {cache_file} unreadable, ignoring")
+            return 0
+        if stored.get('fingerprint') != builder_fingerprint().hex():
+            return 0
+        loaded = 0
+        for name, entries in stored.get('tables', {}).items():
+            if name not in self.tables:
+                continue
+            table = self.tables[name]
+            for key, value in entries[-self.max_entries:]:
+                table[key] = _freeze_normalized(value, name in self.interned)
+                table.move_to_end(key)
+                loaded += 1
+            # 表中已有条目（常驻进程、并行合并）时，载入后可能超出上限
+            self._trim(name)
+        return loaded
+
+    def save(self, cache_dir: Path):
+        """按 LRU 顺序写出，下次载入后淘汰顺序不变"""
+        publish_files(cache_dir, {
+            Path(NORMALIZER_CACHE_FILE): JsonSerializer().dumps({
+                'fingerprint': builder_fingerprint().hex(),
+                'tables': {name: [[k, v] for k, v in table.items()] for name, table in self.tables.items()}
+            }, False)
+        })
+
+    def stats(self) -> Dict[str, Any]:
+        functions = {}
+        total_hits = total_misses = memory = 0
+        for name, table in self.tables.items():
+            counter = self.counters[name]
+            lookups = counter['hits'] + counter['misses']
+            functions[name] = {
+                'hits': counter['hits'],
+                'misses': counter['misses'],
+                'evictions': counter['evictions'],
+                'entries': len(table),
+                'hit_rate': round(counter['hits'] / lookups, 4) if lookups else 0.0
+            }
+            total_hits += counter['hits']
+            total_misses += counter['misses']
+            memory += sys.getsizeof(table) + sum(
+                _normalized_size(k) + _normalized_size(v) for k, v in table.items()
+            )
+        lookups = total_hits + total_misses
+        return {
+            'hit_rate': round(total_hits / lookups, 4) if lookups else 0.0,
+            'hits': total_hits,
+            'misses': total_misses,
+            'memory_bytes': memory,
+            'functions': functions,
+            'intern': STRING_TABLE.stats()
+        }
+
+
+def _freeze_normalized(value: Any, intern_items: bool) -> Any:
+    """JSON 载入的列表 / 子进程传回的 tuple → 驻留后的 tuple（与内存中的存储形式一致）"""
+    if isinstance(value, (list, tuple)):
+        return tuple(STRING_TABLE.intern(v) for v in value) if intern_items else tuple(value)
+    return value
+
+
+def _normalized_size(value: Any) -> int:
+    if isinstance(value, tuple):
+        return sys.getsizeof(value) + sum(sys.getsizeof(v) for v in value)
+    return sys.getsizeof(value)
+
+
+STRING_TABLE = InternTable()
+INTERNED_CARD_FIELDS = ('tags', 'domains', 'authors')  # 经 STRING_TABLE 驻留的卡片字段
+NORMALIZER_CACHE = NormalizerCache()
+
+
+def memoize_normalizer(returns_list: bool = False, intern_items: bool = False) -> Callable:
+    """
+    规范化函数记忆化装饰器（结果存入 NORMALIZER_CACHE）
+    returns_list：结果为 list，缓存 tuple、每次返回新 list
+    intern_items：列表中的字符串经 STRING_TABLE 驻留
+    """
+    def decorate(fn: Callable) -> Callable:
+        name = fn.__name__
+        NORMALIZER_CACHE.register(name, intern_items)
+
+        @functools.wraps(fn)
+        def wrapper(value: str):
+            cached = NORMALIZER_CACHE.get(name, value)
+            if cached is _MISSING:
+                cached = fn(value)
+                if returns_list:
+                    cached = tuple(STRING_TABLE.intern(v) for v in cached) if intern_items else tuple(cached)
+                NORMALIZER_CACHE.put(name, value, cached)
+            return list(cached) if returns_list else cached
+
+        return wrapper
+    return decorate
 
 
 # ============================================================================
 # 解析器：容忍格式漂移
 # ============================================================================
 
+@memoize_normalizer()
 def parse_weight(weight_str: str) -> int:
     """
     解析权重：接受 ★★★★★, 5, ★ ★ ★, *** 等格式
@@ -122,6 +363,7 @@ def parse_weight(weight_str: str) -> int:
     return 3  # 默认值
 
 
+@memoize_normalizer(returns_list=True, intern_items=True)
 def parse_tags(tags_str: str) -> List[str]:
     """
     解析标签：接受空格/逗号/斜杠分隔
@@ -145,9 +387,10 @@ def parse_tags(tags_str: str) -> List[str]:
         
         normalized.append(tag)
     
-    return list(set(normalized))  # 去重
+    return list(dict.fromkeys(normalized))  # 去重（保持首次出现的顺序，输出可复现）
 
 
+@memoize_normalizer()
 def normalize_title(title: str) -> str:
     """
     规范化 title 格式为：中文 | English
@@ -187,66 +430,40 @@ def normalize_title(title: str) -> str:
 
 def normalize_citation(citation: str, lang: str, card_id: str, title: str, epoch_label: str, fragments: List[str]) -> str:
     """
-    规范化 citation 格式
-    
-    英文标准格式：
-    Author (Year). *Title*. Entry ID. Epoch XXX. Filed under: Fragment-XXX, Fragment-XXX.
-    
-    中文标准格式：
-    作者(年份). <标题>. 語螺語研究登錄項:ID．紀錄碎片:Fragment-XXX, Fragment-XXX;紀元:XXX．
+    规范化 citation 格式：按语言分派到该语言管线的 citation_formatter
+    （format_citation_en / format_citation_zh，见「语言管线」一节）
     
-    如果 citation 为空或无法解析，返回空字符串
+    如果 citation 为空，原样返回；无法解析时返回原文
+    """
+    return get_language_pipeline(lang).citation_formatter(citation, card_id, title, epoch_label, fragments)
+
+
+def _tidy_citation(citation: str) -> str:
+    """已是标准格式的 citation：规范化空格、移除重复句号"""
+    citation = re.sub(r'\s+', ' ', citation)  # 规范化空格
+    citation = re.sub(r'\.\s*\.', '.', citation)  # 移除重复句号
+    return citation
+
+
+def _standard_citation_keywords(citation: str) -> str:
+    """确保使用标准关键词"""
+    citation = re.sub(r'Spiral (Registry|Research|Field Codex) Entry', 'Entry', citation)
+    citation = re.sub(r'Registered Epoch', 'Epoch', citation)
+    return citation.strip()
+
+
+def parse_citation_parts(
+    citation: str,
+    card_id: str,
+    title: str,
+    epoch_label: str,
+    fragments: List[str]
+) -> Optional[Tuple[str, str, str, str, str, List[str]]]:
+    """
+    从非标准 citation 中提取 (author, year, title, entry_id, epoch, fragments)
+    变体格式（如註冊紀元、語螺語場編碼條目）在此统一解析，由各语言重构为标准格式
+    无法识别作者与年份时返回 None
     """
-    if not citation:
-        return citation
-    
-    citation = citation.strip()
-    
-    # 检查是否已经是标准格式（使用标准关键词和格式）
-    is_standard_en = lang == 'en' and 'Entry' in citation and re.search(r'Entry\s+[A-Za-z0-9]+\.', citation)
-    is_standard_zh = lang == 'zh' and '語螺語研究登錄項' in citation
-    
-    if is_standard_en or is_standard_zh:
-        # 规范化空格和标点
-        citation = re.sub(r'\s+', ' ', citation)  # 规范化空格
-        citation = re.sub(r'\.\s*\.', '.', citation)  # 移除重复句号
-        # 统一使用 *Title* 格式（英文）
-        if lang == 'en':
-            citation = re.sub(r'<([^>]+?)>', r'*\1*', citation)
-            # 如果标题没有 * 标记，添加它（在 Entry 之前的文本）
-            if '*' not in citation:
-                # 查找 Entry 之前的标题文本
-                entry_pos = citation.find('Entry')
-                if entry_pos > 0:
-                    # 提取作者年份后的文本作为标题
-                    year_match = re.search(r'\((\d{4})\)', citation)
-                    if year_match:
-                        after_year = citation[year_match.end():entry_pos].strip()
-                        # 移除开头的句号和空格
-                        after_year = re.sub(r'^\.\s*', '', after_year).strip()
-                        if after_year and not after_year.startswith('*'):
-                            # 移除标题末尾的句号（如果有）
-                            after_year_clean = re.sub(r'\.\s*$', '', after_year)
-                            # 替换为带 * 的格式
-                            citation = citation[:year_match.end()] + '. *' + after_year_clean + '*. ' + citation[entry_pos:]
-        # 确保使用标准关键词
-        citation = re.sub(r'Spiral (Registry|Research|Field Codex) Entry', 'Entry', citation)
-        citation = re.sub(r'Registered Epoch', 'Epoch', citation)
-        return citation.strip()
-    
-    # 如果不符合标准格式，强制重构
-    # 继续下面的解析逻辑来重构
-    
-    # 中文：检查是否已经是标准格式
-    if lang == 'zh' and '語螺語研究登錄項' in citation and ('紀錄碎片' in citation or '記錄碎片' in citation):
-        # 规范化全角标点
-        citation = re.sub(r'[。]', '．', citation)  # 统一使用全角句号
-        citation = re.sub(r'[：]', ':', citation)  # 统一使用半角冒号
-        return citation.strip()
-    
-    # 如果使用了变体格式（如註冊紀元、語螺語場編碼條目），需要重构为标准格式
-    # 继续下面的解析逻辑来重构
-    
     # 尝试解析现有格式并重构
     # 提取作者和年份（支持多种格式）
     author_patterns = [
@@ -260,8 +477,8 @@ def normalize_citation(citation: str, lang: str, card_id: str, title: str, epoch
             break
     
     if not author_match:
-        # 如果无法解析，返回原样（可能是特殊格式）
-        return citation
+        # 如果无法解析，返回 None（调用方原样保留）
+        return None
     
     # 处理作者（可能有括号说明）
     if len(author_match.groups()) == 3:
@@ -345,60 +562,122 @@ def normalize_citation(citation: str, lang: str, card_id: str, title: str, epoch
     if not found_fragments and fragments:
         found_fragments = [f.replace('Fragment-', '') for f in fragments if f.startswith('Fragment-')]
     
-    # 构建标准格式
-    if lang == 'en':
-        # 英文格式：Author (Year). *Title*. Entry ID. Epoch XXX. Filed under: Fragment-XXX, Fragment-XXX.
-        title_part = f"*{extracted_title}*" if extracted_title else f"*{title}*"
-        citation_parts = [
-            f"{author} ({year}).",
-            title_part,
-            f"Entry {entry_id}."
-        ]
-        
-        if extracted_epoch:
-            citation_parts.append(f"Epoch {extracted_epoch}.")
-        
-        if found_fragments:
-            fragment_list = ', '.join([f"Fragment-{f}" for f in found_fragments])
-            citation_parts.append(f"Filed under: {fragment_list}.")
-        
-        result = ' '.join(citation_parts)
-        # 移除重复的 Epoch
-        result = re.sub(r'Epoch\s+([A-Za-z0-9\-]+)\.\s*Epoch\s+\1\.', r'Epoch \1.', result)
-        return result
+    return author, year, extracted_title, entry_id, extracted_epoch, found_fragments
+
+
+def format_citation_en(citation: str, card_id: str, title: str, epoch_label: str, fragments: List[str]) -> str:
+    """
+    英文标准格式：
+    Author (Year). *Title*. Entry ID. Epoch XXX. Filed under: Fragment-XXX, Fragment-XXX.
+    """
+    if not citation:
+        return citation
     
-    else:  # zh
-        # 中文格式：作者(年份). <标题>. 語螺語研究登錄項:ID．紀錄碎片:Fragment-XXX, Fragment-XXX;紀元:XXX．
-        title_part = f"<{extracted_title}>" if extracted_title else f"<{title}>"
-        # 规范化作者格式（确保有空格）
-        author_formatted = author.strip()
-        if not author_formatted.endswith(' '):
-            author_formatted += ' '
-        
-        citation_parts = [
-            f"{author_formatted}({year}).",
-            f"{title_part}.",
-            f"語螺語研究登錄項:{entry_id}．"
-        ]
-        
+    citation = citation.strip()
+    
+    # 检查是否已经是标准格式（使用标准关键词和格式）
+    if 'Entry' in citation and re.search(r'Entry\s+[A-Za-z0-9]+\.', citation):
+        citation = _tidy_citation(citation)
+        # 统一使用 *Title* 格式
+        citation = re.sub(r'<([^>]+?)>', r'*\1*', citation)
+        # 如果标题没有 * 标记，添加它（在 Entry 之前的文本）
+        if '*' not in citation:
+            # 查找 Entry 之前的标题文本
+            entry_pos = citation.find('Entry')
+            if entry_pos > 0:
+                # 提取作者年份后的文本作为标题
+                year_match = re.search(r'\((\d{4})\)', citation)
+                if year_match:
+                    after_year = citation[year_match.end():entry_pos].strip()
+                    # 移除开头的句号和空格
+                    after_year = re.sub(r'^\.\s*', '', after_year).strip()
+                    if after_year and not after_year.startswith('*'):
+                        # 移除标题末尾的句号（如果有）
+                        after_year_clean = re.sub(r'\.\s*$', '', after_year)
+                        # 替换为带 * 的格式
+                        citation = citation[:year_match.end()] + '. *' + after_year_clean + '*. ' + citation[entry_pos:]
+        return _standard_citation_keywords(citation)
+    
+    # 如果不符合标准格式，强制重构
+    parts = parse_citation_parts(citation, card_id, title, epoch_label, fragments)
+    if parts is None:
+        # 如果无法解析，返回原样（可能是特殊格式）
+        return citation
+    author, year, extracted_title, entry_id, extracted_epoch, found_fragments = parts
+    
+    # 英文格式：Author (Year). *Title*. Entry ID. Epoch XXX. Filed under: Fragment-XXX, Fragment-XXX.
+    title_part = f"*{extracted_title}*" if extracted_title else f"*{title}*"
+    citation_parts = [
+        f"{author} ({year}).",
+        title_part,
+        f"Entry {entry_id}."
+    ]
+    
+    if extracted_epoch:
+        citation_parts.append(f"Epoch {extracted_epoch}.")
+    
+    if found_fragments:
+        fragment_list = ', '.join([f"Fragment-{f}" for f in found_fragments])
+        citation_parts.append(f"Filed under: {fragment_list}.")
+    
+    result = ' '.join(citation_parts)
+    # 移除重复的 Epoch
+    result = re.sub(r'Epoch\s+([A-Za-z0-9\-]+)\.\s*Epoch\s+\1\.', r'Epoch \1.', result)
+    return result
+
+
+def format_citation_zh(citation: str, card_id: str, title: str, epoch_label: str, fragments: List[str]) -> str:
+    """
+    中文标准格式：
+    作者(年份). <标题>. 語螺語研究登錄項:ID．紀錄碎片:Fragment-XXX, Fragment-XXX;紀元:XXX．
+    """
+    if not citation:
+        return citation
+    
+    citation = citation.strip()
+    
+    # 检查是否已经是标准格式
+    if '語螺語研究登錄項' in citation:
+        return _standard_citation_keywords(_tidy_citation(citation))
+    
+    # 如果使用了变体格式（如註冊紀元、語螺語場編碼條目），需要重构为标准格式
+    parts = parse_citation_parts(citation, card_id, title, epoch_label, fragments)
+    if parts is None:
+        # 如果无法解析，返回原样（可能是特殊格式）
+        return citation
+    author, year, extracted_title, entry_id, extracted_epoch, found_fragments = parts
+    
+    # 中文格式：作者(年份). <标题>. 語螺語研究登錄項:ID．紀錄碎片:Fragment-XXX, Fragment-XXX;紀元:XXX．
+    title_part = f"<{extracted_title}>" if extracted_title else f"<{title}>"
+    # 规范化作者格式（确保有空格）
+    author_formatted = author.strip()
+    if not author_formatted.endswith(' '):
+        author_formatted += ' '
+    
+    citation_parts = [
+        f"{author_formatted}({year}).",
+        f"{title_part}.",
+        f"語螺語研究登錄項:{entry_id}．"
+    ]
+    
+    if found_fragments:
+        fragment_list = ', '.join([f"Fragment-{f}" for f in found_fragments])
+        citation_parts.append(f"紀錄碎片:{fragment_list}")
+    
+    if extracted_epoch:
         if found_fragments:
-            fragment_list = ', '.join([f"Fragment-{f}" for f in found_fragments])
-            citation_parts.append(f"紀錄碎片:{fragment_list}")
-        
-        if extracted_epoch:
-            if found_fragments:
-                citation_parts[-1] += f";紀元:{extracted_epoch}．"
-            else:
-                citation_parts.append(f"紀元:{extracted_epoch}．")
+            citation_parts[-1] += f";紀元:{extracted_epoch}．"
         else:
-            if found_fragments:
-                citation_parts[-1] += "．"
-        
-        result = ''.join(citation_parts)
-        # 规范化空格
-        result = re.sub(r'\s+', ' ', result)
-        result = re.sub(r'\.\s*\.', '.', result)
-        return result
+            citation_parts.append(f"紀元:{extracted_epoch}．")
+    else:
+        if found_fragments:
+            citation_parts[-1] += "．"
+    
+    result = ''.join(citation_parts)
+    # 规范化空格
+    result = re.sub(r'\s+', ' ', result)
+    result = re.sub(r'\.\s*\.', '.', result)
+    return result
 
 
 def parse_fragments(fragments_str: str) -> List[str]:
@@ -443,6 +722,7 @@ def parse_scope(scope_str: str) -> List[str]:
     return items
 
 
+@memoize_normalizer(returns_list=True, intern_items=True)
 def parse_authors(author_str: str) -> List[str]:
     """解析作者：支持 × 分隔"""
     if not author_str:
@@ -453,6 +733,7 @@ def parse_authors(author_str: str) -> List[str]:
     return [p.strip() for p in parts if p.strip()]
 
 
+@memoize_normalizer(returns_list=True, intern_items=True)
 def parse_domains(category_str: str) -> List[str]:
     """解析分类/域：支持 / 分隔"""
     if not category_str:
@@ -462,6 +743,7 @@ def parse_domains(category_str: str) -> List[str]:
     return [p.strip() for p in parts if p.strip()]
 
 
+@memoize_normalizer()
 def parse_epoch(epoch_str: str) -> Tuple[str, int]:
     """
     解析纪元：返回 (label, order)
@@ -498,9 +780,10 @@ def parse_layer_header(line: str) -> Optional[str]:
     return None
 
 
-def parse_txt_file(filepath: Path, should_sanitize: bool = True) -> Dict[str, Any]:
+def parse_txt_file(filepath: Path, should_sanitize: bool = True, lang: Optional[str] = None) -> Dict[str, Any]:
     """
     解析单个 TXT 文件，返回卡片对象（未完全规范化）
+    lang：按该语言管线的 sanitizer 清理文本（None 时使用默认标点清理）
     """
     with open(filepath, 'r', encoding='utf-8') as f:
         content = f.read()
@@ -562,21 +845,21 @@ def parse_txt_file(filepath: Path, should_sanitize: bool = True) -> Dict[str, An
     weight_str = block.get('Weight', '').strip()
     
     # 解析并清理文本字段
-    abstract = sanitize_text(block.get('Abstract', ''), should_sanitize)
+    abstract = sanitize_text(block.get('Abstract', ''), should_sanitize, lang)
     scope = block.get('Scope', '')
     citation_raw = block.get('Citation', '').strip()
     fragments_str = block.get('Fragments', '')
     tags_str = block.get('Tags', '')
     
     # ✅ 支持额外字段（ResearchQuestion, Method, Modules）
-    research_question = sanitize_text(block.get('ResearchQuestion', ''), should_sanitize)
-    method = sanitize_text(block.get('Method', ''), should_sanitize)
+    research_question = sanitize_text(block.get('ResearchQuestion', ''), should_sanitize, lang)
+    method = sanitize_text(block.get('Method', ''), should_sanitize, lang)
     modules_str = block.get('Modules', '').strip()
     
     # 解析数组字段
     scope_list = parse_scope(scope)
     if should_sanitize:
-        scope_list = [sanitize_text(s, True) for s in scope_list]
+        scope_list = [sanitize_text(s, True, lang) for s in scope_list]
     
     fragments_list = parse_fragments(fragments_str)
     tags_list = parse_tags(tags_str)
@@ -591,12 +874,12 @@ def parse_txt_file(filepath: Path, should_sanitize: bool = True) -> Dict[str, An
     weight = parse_weight(weight_str)
     
     # 应用标点清理（如果启用）
-    citation = sanitize_text(citation_raw, should_sanitize) if citation_raw else ''
+    citation = sanitize_text(citation_raw, should_sanitize, lang) if citation_raw else ''
     
     # 处理 layers
     normalized_layers = []
     for layer in layers:
-        layer_content = sanitize_text(layer['content'].strip(), should_sanitize)
+        layer_content = sanitize_text(layer['content'].strip(), should_sanitize, lang)
         normalized_layers.append({
             'name': layer['name'],
             'blocks': [
@@ -701,6 +984,224 @@ def normalize_to_schema(parsed: Dict[str, Any], lang: str) -> Dict[str, Any]:
     return card
 
 
+# ============================================================================
+# 卡片模型：__slots__ dataclass，替代嵌套 dict
+# ============================================================================
+#
+# 与 JSON schema 无损互转：to_dict() 的键序与 normalize_to_schema 一致，
+# 未知字段保存在 extra 中原样写回。tags / domains / authors 等重复度高的
+# 字符串经 sys.intern 驻留，同一字符串在全部卡片间只保留一份。
+
+def _intern_list(values: Optional[List[str]]) -> List[str]:
+    return [sys.intern(v) if isinstance(v, str) else v for v in values or []]
+
+
+@dataclass(slots=True)
+class Epoch:
+    label: str = ''
+    order: int = 0
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'Epoch':
+        return cls(data.get('label', ''), data.get('order', 0))
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {'label': self.label, 'order': self.order}
+
+
+@dataclass(slots=True)
+class Block:
+    kind: str
+    text: Optional[str] = None
+    extra: Optional[Dict[str, Any]] = None  # table / list 等类型的其它字段
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'Block':
+        extra = {k: v for k, v in data.items() if k not in ('kind', 'text')}
+        return cls(sys.intern(data['kind']), data.get('text'), extra or None)
+
+    def to_dict(self) -> Dict[str, Any]:
+        result: Dict[str, Any] = {'kind': self.kind}
+        if self.text is not None:
+            result['text'] = self.text
+        if self.extra:
+            result.update(self.extra)
+        return result
+
+
+@dataclass(slots=True)
+class Layer:
+    name: str
+    blocks: Optional[List[Block]] = field(default_factory=list)  # 懒加载模式下为 None
+    bytes: Optional[int] = None
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'Layer':
+        blocks = data.get('blocks')
+        return cls(
+            sys.intern(data['name']),
+            [Block.from_dict(b) for b in blocks] if blocks is not None else None,
+            data.get('bytes')
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        result: Dict[str, Any] = {'name': self.name}
+        if self.blocks is not None:
+            result['blocks'] = [b.to_dict() for b in self.blocks]
+        if self.bytes is not None:
+            result['bytes'] = self.bytes
+        return result
+
+
+@dataclass(slots=True)
+class Observation:
+    visibility: str = 'public'
+    featured: bool = False
+    suppress: List[str] = field(default_factory=list)
+    extra: Optional[Dict[str, Any]] = None
+
+    _KEYS = ('visibility', 'featured', 'suppress')
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'Observation':
+        extra = {k: v for k, v in data.items() if k not in cls._KEYS}
+        return cls(
+            sys.intern(data.get('visibility', 'public')),
+            data.get('featured', False),
+            _intern_list(data.get('suppress')),
+            extra or None
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        result = {'visibility': self.visibility, 'featured': self.featured, 'suppress': list(self.suppress)}
+        if self.extra:
+            result.update(self.extra)
+        return result
+
+
+@dataclass(slots=True)
+class Origin:
+    legacy_txt: str = ''
+    migrated_at: str = ''
+    extra: Optional[Dict[str, Any]] = None
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'Origin':
+        extra = {k: v for k, v in data.items() if k not in ('legacy_txt', 'migrated_at')}
+        return cls(data.get('legacy_txt', ''), sys.intern(data.get('migrated_at', '')), extra or None)
+
+    def to_dict(self) -> Dict[str, Any]:
+        result = {'legacy_txt': self.legacy_txt, 'migrated_at': self.migrated_at}
+        if self.extra:
+            result.update(self.extra)
+        return result
+
+
+# Card 的 JSON 键序（与 normalize_to_schema 一致）；可选字段为空时不输出
+_CARD_KEYS = (
+    'glyph', 'id', 'lang', 'kind', 'epoch', 'weight', 'title', 'authors', 'domains', 'tags',
+    'abstract', 'scope', 'citation', 'fragments', 'layers', 'echo', 'observation', 'seal', 'origin',
+)
+_CARD_OPTIONAL_KEYS = ('research_question', 'method', 'modules')
+
+
+@dataclass(slots=True)
+class Card:
+    glyph: str
+    id: str
+    lang: str
+    kind: str
+    epoch: Epoch
+    weight: int
+    title: str
+    authors: List[str] = field(default_factory=list)
+    domains: List[str] = field(default_factory=list)
+    tags: List[str] = field(default_factory=list)
+    abstract: str = ''
+    scope: List[str] = field(default_factory=list)
+    citation: str = ''
+    fragments: List[str] = field(default_factory=list)
+    layers: List[Layer] = field(default_factory=list)
+    echo: List[Dict[str, Any]] = field(default_factory=list)
+    observation: Observation = field(default_factory=Observation)
+    seal: Dict[str, Any] = field(default_factory=dict)
+    origin: Origin = field(default_factory=Origin)
+    research_question: Optional[str] = None
+    method: Optional[str] = None
+    modules: Optional[List[str]] = None
+    extra: Optional[Dict[str, Any]] = None  # schema 之外的字段，原样保留
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'Card':
+        """从 schema dict 构建（例如 normalize_to_schema 的结果或 cards.json 中的一项）"""
+        known = set(_CARD_KEYS) | set(_CARD_OPTIONAL_KEYS)
+        extra = {k: v for k, v in data.items() if k not in known}
+        modules = data.get('modules')
+        return cls(
+            glyph=sys.intern(data['glyph']),
+            id=data['id'],
+            lang=sys.intern(data['lang']),
+            kind=sys.intern(data['kind']),
+            epoch=Epoch.from_dict(data.get('epoch') or {}),
+            weight=data['weight'],
+            title=data['title'],
+            authors=_intern_list(data.get('authors')),
+            domains=_intern_list(data.get('domains')),
+            tags=_intern_list(data.get('tags')),
+            abstract=data.get('abstract', ''),
+            scope=list(data.get('scope', [])),
+            citation=data.get('citation', ''),
+            fragments=_intern_list(data.get('fragments')),
+            layers=[Layer.from_dict(layer) for layer in data.get('layers', [])],
+            echo=list(data.get('echo', [])),
+            observation=Observation.from_dict(data.get('observation') or {}),
+            seal=dict(data.get('seal') or {}),
+            origin=Origin.from_dict(data.get('origin') or {}),
+            research_question=data.get('research_question'),
+            method=data.get('method'),
+            modules=_intern_list(modules) if modules is not None else None,
+            extra=extra or None
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        """转换回 Spiral Card Schema v1.0 dict（键序与 normalize_to_schema 一致）"""
+        result = {
+            'glyph': self.glyph,
+            'id': self.id,
+            'lang': self.lang,
+            'kind': self.kind,
+            'epoch': self.epoch.to_dict(),
+            'weight': self.weight,
+            'title': self.title,
+            'authors': list(self.authors),
+            'domains': list(self.domains),
+            'tags': list(self.tags),
+            'abstract': self.abstract,
+            'scope': list(self.scope),
+            'citation': self.citation,
+            'fragments': list(self.fragments),
+            'layers': [layer.to_dict() for layer in self.layers],
+            'echo': list(self.echo),
+            'observation': self.observation.to_dict(),
+            'seal': dict(self.seal),
+            'origin': self.origin.to_dict()
+        }
+        if self.research_question is not None:
+            result['research_question'] = self.research_question
+        if self.method is not None:
+            result['method'] = self.method
+        if self.modules is not None:
+            result['modules'] = list(self.modules)
+        if self.extra:
+            result.update(self.extra)
+        return result
+
+
+def normalize_to_model(parsed: Dict[str, Any], lang: str) -> Card:
+    """normalize_to_schema 的模型版本：长驻进程保存卡片时使用"""
+    return Card.from_dict(normalize_to_schema(parsed, lang))
+
+
 # ============================================================================
 # 验证
 # ============================================================================
@@ -709,203 +1210,2240 @@ class ValidationError(Exception):
     pass
 
 
+# ----------------------------------------------------------------------------
+# Schema 验证引擎：Card Schema v1.0 只编译一次，得到逐字段检查函数
+# ----------------------------------------------------------------------------
+
+CARD_KINDS = ('research', 'law', 'directive', 'appendix', 'draft')
+BLOCK_KINDS = ('markdown', 'list', 'table', 'ascii', 'code')
+ECHO_MODES = ('reference', 'depends', 'extends', 'conflicts')
+SEAL_KINDS = ('law', 'directive')
+CARD_SECTIONS = ('abstract', 'scope', 'citation', 'fragments', 'tags', 'layers')
+
+_STR_LIST = {'type': list, 'items': {'type': str}}
+
+# 声明式 schema（对应 docs/card-schema.md）
+# 节点键：type / required / non_empty / enum / range / pattern / items / fields / variants / warn_empty
+CARD_SCHEMA: Dict[str, Any] = {
+    'type': dict,
+    'fields': {
+        # 1️⃣ Identity Layer
+        'glyph': {'type': str, 'required': True, 'non_empty': True},
+        'id': {'type': str, 'required': True, 'non_empty': True},
+        'lang': {'type': str, 'required': True, 'non_empty': True, 'enum': ()},  # 由 register_language 填充
+        'kind': {'type': str, 'required': True, 'non_empty': True, 'enum': CARD_KINDS},
+        # 2️⃣ Epoch Layer
+        'epoch': {
+            'type': dict,
+            'required': True,
+            'non_empty': True,
+            'fields': {
+                'label': {'type': str, 'required': True},
+                'order': {'type': int, 'required': True},
+            },
+        },
+        'weight': {'type': int, 'required': True, 'non_empty': True, 'range': (1, 5)},
+        # 3️⃣ Attribution Layer
+        'authors': _STR_LIST,
+        'domains': _STR_LIST,
+        'tags': {
+            'type': list,
+            'items': {'type': str, 'pattern': r'^#\S+$'},
+            'warn_empty': 'Empty tags',
+        },
+        # 4️⃣ Core Content Layer
+        'title': {'type': str, 'required': True, 'non_empty': True},
+        'abstract': {'type': str},
+        'scope': _STR_LIST,
+        'citation': {'type': str, 'warn_empty': 'Empty citation'},
+        'fragments': {'type': list, 'items': {'type': str}, 'warn_empty': 'Empty fragments'},
+        # 5️⃣ Layer / Block Layer
+        'layers': {
+            'type': list,
+            'items': {
+                'type': dict,
+                'fields': {
+                    'name': {'type': str, 'required': True, 'non_empty': True},
+                    # 拆分输出（--split-layers）的 stub 只有 name / bytes；
+                    # blocks 是否必需由 _check_card_rules 按 layers_src 判断
+                    'bytes': {'type': int},
+                    'blocks': {
+                        'type': list,
+                        'items': {
+                            'type': dict,
+                            'fields': {
+                                'kind': {'type': str, 'required': True, 'enum': BLOCK_KINDS},
+                            },
+                            # 按 block.kind 分派的附加字段
+                            'variants': ('kind', {
+                                'markdown': {'text': {'type': str, 'required': True}},
+                                'ascii': {'text': {'type': str, 'required': True}},
+                                'code': {'text': {'type': str, 'required': True}},
+                                'list': {'items': {'type': list, 'required': True}},
+                                'table': {
+                                    'headers': {'type': list, 'required': True},
+                                    'rows': {'type': list, 'required': True, 'items': {'type': list}},
+                                },
+                            }),
+                        },
+                    },
+                },
+            },
+        },
+        # 6️⃣ Relation / Echo Layer
+        'echo': {
+            'type': list,
+            'items': {
+                'type': dict,
+                'fields': {
+                    'mode': {'type': str, 'required': True, 'enum': ECHO_MODES},
+                    'target': {'type': str, 'required': True, 'non_empty': True},
+                    'note': {'type': str},
+                },
+            },
+        },
+        # 7️⃣ Observation / UI Flags
+        'observation': {
+            'type': dict,
+            'fields': {
+                'visibility': {'type': str},
+                'featured': {'type': bool},
+                'suppress': {'type': list, 'items': {'type': str, 'enum': CARD_SECTIONS}},
+            },
+        },
+        # 8️⃣ Seal / Policy Layer
+        'seal': {
+            'type': dict,
+            'fields': {
+                'non_derivable': {'type': bool},
+                'mimic_warning': {'type': bool},
+                'reuse_policy': {'type': str},
+            },
+        },
+        # 9️⃣ Provenance Layer
+        'origin': {
+            'type': dict,
+            'fields': {
+                'legacy_txt': {'type': str},
+                'migrated_at': {'type': str, 'pattern': r'^\d{4}-\d{2}-\d{2}$'},
+            },
+        },
+        # 拆分 / 预渲染输出附加的字段
+        'layers_src': {'type': str, 'non_empty': True},
+        'content_hash': {'type': str, 'non_empty': True},
+        # 额外字段
+        'research_question': {'type': str},
+        'method': {'type': str},
+        'modules': _STR_LIST,
+    },
+}
+
+_TYPE_NAMES = {str: 'string', int: 'integer', bool: 'boolean', list: 'array', dict: 'object'}
+
+# 单个违规：(severity, path, message)，severity 为 'error' 或 'warning'
+Violation = Tuple[str, str, str]
+
+
+class _SchemaCompiler:
+    """
+    Schema → Python 源码 → 函数
+    每个字段展开为内联的 if 检查；合法值只走类型判断，
+    JSON path 只在出错时才以 f-string 形式拼接
+    """
+
+    def __init__(self):
+        self.lines: List[str] = []
+        self.consts: List[Any] = []
+        self.counter = 0
+
+    def const(self, value: Any) -> str:
+        self.consts.append(value)
+        return f"_C[{len(self.consts) - 1}]"
+
+    def fresh(self, prefix: str) -> str:
+        self.counter += 1
+        return f"{prefix}{self.counter}"
+
+    def emit(self, depth: int, line: str):
+        self.lines.append('    ' * depth + line)
+
+    def emit_violation(self, depth: int, severity: str, path: str, message_expr: str):
+        self.emit(depth, f"_out(({severity!r}, f{path!r}, {message_expr}))")
+
+    def compile(self, spec: Dict[str, Any]):
+        self.emit(0, "def _validate(v0, _out):")
+        self.node(spec, 'v0', '$', 1)
+        self.emit(1, "return None")
+        namespace = {'_C': self.consts, '_MISSING': _MISSING}
+        exec(compile('\n'.join(self.lines), '<card-schema>', 'exec'), namespace)
+        return namespace['_validate']
+
+    def node(self, spec: Dict[str, Any], var: str, path: str, depth: int):
+        expected = spec['type']
+        type_test = f"type({var}) is not int" if expected is int else f"not isinstance({var}, {expected.__name__})"
+        self.emit(depth, f"if {type_test}:")
+        self.emit_violation(
+            depth + 1, 'error', path,
+            f"'expected {_TYPE_NAMES[expected]}, got ' + type({var}).__name__"
+        )
+        self.emit(depth, "else:")
+        body_start = len(self.lines)
+        self.body(spec, var, path, depth + 1)
+        if len(self.lines) == body_start:
+            self.emit(depth + 1, "pass")
+
+    def body(self, spec: Dict[str, Any], var: str, path: str, depth: int):
+        if 'enum' in spec:
+            allowed = self.const(frozenset(spec['enum']))
+            self.emit(depth, f"if {var} not in {allowed}:")
+            self.emit_violation(
+                depth + 1, 'error', path,
+                f"{'must be one of ' + ' | '.join(spec['enum']) + ', got '!r} + repr({var})"
+            )
+        if 'range' in spec:
+            lo, hi = spec['range']
+            self.emit(depth, f"if not ({lo!r} <= {var} <= {hi!r}):")
+            self.emit_violation(depth + 1, 'error', path, f"{f'must be {lo}-{hi}, got '!r} + str({var})")
+        if 'pattern' in spec:
+            match = self.const(re.compile(spec['pattern']).match)
+            self.emit(depth, f"if {match}({var}) is None:")
+            self.emit_violation(
+                depth + 1, 'error', path,
+                f"{'must match ' + spec['pattern'] + ', got '!r} + repr({var})"
+            )
+        if 'warn_empty' in spec:
+            self.emit(depth, f"if not {var}:")
+            self.emit_violation(depth + 1, 'warning', path, repr(spec['warn_empty']))
+        if 'items' in spec:
+            idx, item = self.fresh('i'), self.fresh('v')
+            self.emit(depth, f"for {idx}, {item} in enumerate({var}):")
+            self.node(spec['items'], item, f"{path}[{{{idx}}}]", depth + 1)
+        if 'fields' in spec:
+            self.fields(spec['fields'], var, path, depth)
+        if 'variants' in spec:
+            discriminator, variant_specs = spec['variants']
+            tag = self.fresh('k')
+            self.emit(depth, f"{tag} = {var}.get({discriminator!r})")
+            keyword = 'if'
+            for name, fields in variant_specs.items():
+                self.emit(depth, f"{keyword} {tag} == {name!r}:")
+                self.fields(fields, var, path, depth + 1)
+                keyword = 'elif'
+
+    def fields(self, fields: Dict[str, Dict[str, Any]], var: str, path: str, depth: int):
+        for key, spec in fields.items():
+            value = self.fresh('v')
+            key_path = f"{path}.{key}"
+            missing = repr(f"Missing required field: {key}")
+            self.emit(depth, f"{value} = {var}.get({key!r}, _MISSING)")
+            self.emit(depth, f"if {value} is _MISSING or {value} is None:")
+            if spec.get('required'):
+                self.emit_violation(depth + 1, 'error', key_path, missing)
+            else:
+                self.emit(depth + 1, "pass")
+            if spec.get('non_empty'):
+                self.emit(depth, f"elif not {value}:")
+                self.emit_violation(depth + 1, 'error', key_path, missing)
+            self.emit(depth, "else:")
+            self.node(spec, value, key_path, depth + 1)
+
+
+_MISSING = object()
+
+
+def _check_card_rules(card: Dict[str, Any], out: List[Violation]):
+    """跨字段规则（无法用单字段 schema 表达的部分）"""
+    glyph = card.get('glyph')
+    lang = card.get('lang')
+    card_id = card.get('id')
+    if isinstance(glyph, str) and isinstance(lang, str) and card_id and card_id != f"{glyph}-{lang}":
+        out.append(('error', '$.id', f"id must be glyph-lang ({glyph}-{lang}), got {card_id!r}"))
+    layers = card.get('layers')
+    if isinstance(layers, list):
+        # 完整卡片的每个 layer 都必须有 blocks；拆分 stub（带 layers_src）改为要求 bytes
+        stub = bool(card.get('layers_src'))
+        for i, layer in enumerate(layers):
+            if not isinstance(layer, dict):
+                continue
+            required = 'bytes' if stub else 'blocks'
+            if required not in layer:
+                out.append(('error', f"$.layers[{i}].{required}", f"Missing required field: {required}"))
+    seal = card.get('seal')
+    if seal and card.get('kind') not in SEAL_KINDS:
+        out.append(('warning', '$.seal', f"seal is only meaningful for kind = {' | '.join(SEAL_KINDS)}"))
+
+
+def compile_card_schema(schema: Dict[str, Any] = CARD_SCHEMA):
+    """
+    编译 schema，返回 validate(card) -> List[Violation]
+    编译结果可复用于任意数量的卡片
+    """
+    schema_check = _SchemaCompiler().compile(schema)
+
+    def validate(card: Dict[str, Any]) -> List[Violation]:
+        out: List[Violation] = []
+        schema_check(card, out.append)
+        if isinstance(card, dict):
+            _check_card_rules(card, out)
+        return out
+
+    return validate
+
+
+_compiled_card_validator = None
+
+
+def get_card_validator():
+    """默认 schema 的编译结果（惰性编译，进程内只编译一次）"""
+    global _compiled_card_validator
+    if _compiled_card_validator is None:
+        _compiled_card_validator = compile_card_schema(CARD_SCHEMA)
+    return _compiled_card_validator
+
+
+def format_violation(violation: Violation) -> str:
+    """格式化为报告字符串：<JSON path>: <message>"""
+    _, path, message = violation
+    return f"{path}: {message}"
+
+
+def validate_cards(
+    cards: List[Dict[str, Any]],
+    cache: Optional[Dict[Any, List[Violation]]] = None,
+    keys: Optional[List[Any]] = None
+) -> List[Tuple[List[str], List[str]]]:
+    """
+    对全部卡片做一次批量验证
+    唯一性（id、(glyph, lang)）用哈希表一次计算，避免逐卡扫描 all_cards
+    cache：跨构建保留的逐卡 schema 检查结果（key → violations，keys 与 cards 对齐），
+           常驻进程用；唯一性每次重新计算
+    返回与 cards 对齐的 [(errors, warnings), ...]
+    """
+    validate = get_card_validator()
+    seen_ids: Dict[Any, int] = {}
+    seen_keys: Dict[Tuple[Any, Any], int] = {}
+    results = []
+
+    for idx, card in enumerate(cards):
+        if cache is not None:
+            key = keys[idx]
+            violations = cache.get(key)
+            if violations is None:
+                violations = cache[key] = validate(card)
+            violations = list(violations)
+        else:
+            violations = validate(card)
+        if not isinstance(card, dict):
+            results.append(([format_violation(v) for v in violations], []))
+            continue
+
+        card_id = card.get('id')
+        if card_id:
+            first = seen_ids.setdefault(card_id, idx)
+            if first != idx:
+                violations.append(('error', '$.id', f"Duplicate id: {card_id}"))
+        glyph, lang = card.get('glyph'), card.get('lang')
+        if glyph and lang:
+            first = seen_keys.setdefault((glyph, lang), idx)
+            if first != idx:
+                violations.append(('error', '$.glyph', f"Duplicate (glyph, lang): ({glyph}, {lang})"))
+
+        errors = [format_violation(v) for v in violations if v[0] == 'error']
+        warnings = [format_violation(v) for v in violations if v[0] == 'warning']
+        results.append((errors, warnings))
+
+    return results
+
+
 def validate_card(card: Dict[str, Any], all_cards: List[Dict[str, Any]]) -> Tuple[List[str], List[str]]:
     """
-    验证单个卡片
-    返回 (errors, warnings)
-    """
-    errors = []
-    warnings = []
-    
-    # 必需字段检查
-    required_fields = ['glyph', 'id', 'lang', 'kind', 'title', 'epoch', 'weight']
-    for field in required_fields:
-        if field not in card or not card[field]:
-            errors.append(f"Missing required field: {field}")
-    
-    # weight 范围检查
-    if 'weight' in card:
-        if not (1 <= card['weight'] <= 5):
-            errors.append(f"weight must be 1-5, got {card['weight']}")
-    
-    # 重复 id 检查
-    if 'id' in card:
-        duplicates = [c for c in all_cards if c.get('id') == card['id']]
-        if len(duplicates) > 1:
-            errors.append(f"Duplicate id: {card['id']}")
-    
-    # 重复 (glyph, lang) 检查
-    if 'glyph' in card and 'lang' in card:
-        duplicates = [
-            c for c in all_cards
-            if c.get('glyph') == card['glyph'] and c.get('lang') == card['lang']
-        ]
-        if len(duplicates) > 1:
-            errors.append(f"Duplicate (glyph, lang): ({card['glyph']}, {card['lang']})")
-    
-    # 警告：空字段
-    if not card.get('tags'):
-        warnings.append("Empty tags")
-    if not card.get('fragments'):
-        warnings.append("Empty fragments")
-    if not card.get('citation'):
-        warnings.append("Empty citation")
-    
+    验证单个卡片（与 all_cards 比较唯一性）
+    返回 (errors, warnings)；批量场景请使用 validate_cards
+    """
+    violations = get_card_validator()(card)
+
+    # 重复 id / (glyph, lang) 检查
+    others = [c for c in all_cards if c is not card]
+    if card.get('id') and any(c.get('id') == card['id'] for c in others):
+        violations.append(('error', '$.id', f"Duplicate id: {card['id']}"))
+    glyph, lang = card.get('glyph'), card.get('lang')
+    if glyph and lang and any(c.get('glyph') == glyph and c.get('lang') == lang for c in others):
+        violations.append(('error', '$.glyph', f"Duplicate (glyph, lang): ({glyph}, {lang})"))
+
+    errors = [format_violation(v) for v in violations if v[0] == 'error']
+    warnings = [format_violation(v) for v in violations if v[0] == 'warning']
     return errors, warnings
 
 
 # ============================================================================
-# 主生成器
+# 词表规范化：tag / domain 变体归并（#field_mirroring ≈ #field-mirroring ≈ #FieldMirroring）
 # ============================================================================
+#
+# 1. 规范键：NFKC + casefold + 去掉分隔符（空白 _ - · . ・），键相同即为同一词
+# 2. 模糊归并：规范键的字符 trigram 倒排索引（前缀过滤）只召回可能达到阈值的
+#    候选，Jaccard ≥ 阈值才合并（复数、拼写漂移），避免全量两两比较
+# 3. 每组取出现次数最多的写法为规范形（并列时取字典序最小，CamelCase 优先）
 
-def build_registry(
-    registry_dir: Path,
-    output_dir: Path,
-    should_sanitize: bool = True,
-    languages: List[str] = ['zh', 'en']
-) -> Dict[str, Any]:
+ALIAS_FILE = 'aliases.json'  # 仓库中人工审核过的别名表（输入，registry_dir 下）
+APPLIED_ALIAS_FILE = 'aliases.applied.json'  # 本次构建实际应用的别名表（输出）
+ALIAS_SIMILARITY = 0.8  # 模糊匹配默认只作为建议写入报告
+ALIAS_NGRAM = 3
+ALIAS_MIN_FUZZY_LEN = 8  # 短词 trigram 太少，只做精确规范键归并
+NEGATION_PREFIXES = ('non', 'anti', 'un', 'not', '非', '反', '不', '无', '無')
+
+_VOCAB_SEPARATORS = re.compile(r'[\s_\-·.・]+')
+
+
+def vocabulary_key(term: str) -> str:
+    """规范键：'#Field_Mirroring' / '#field-mirroring' → 'fieldmirroring'"""
+    term = unicodedata.normalize('NFKC', term).lstrip('#')
+    return _VOCAB_SEPARATORS.sub('', term).casefold()
+
+
+def _key_ngrams(key: str, n: int = ALIAS_NGRAM) -> set:
+    return {key[i:i + n] for i in range(len(key) - n + 1)}
+
+
+def _negation_differs(a: str, b: str) -> bool:
+    """一方以否定前缀开头而另一方不是（如 nonrecursivefield / recursivefield），不可模糊合并"""
+    return any(a.startswith(prefix) != b.startswith(prefix) for prefix in NEGATION_PREFIXES)
+
+
+def build_alias_map(counts: Counter, threshold: Optional[float] = None) -> Dict[str, str]:
     """
-    构建注册表
-    返回报告数据
+    按词频 counts 归并变体，返回 {变体: 规范形}（不含规范形自身）
+    threshold 为 None 时只做规范键归并；模糊合并不跨越否定前缀
     """
-    all_cards = []
-    invalid_cards = []
-    per_card_warnings = {}
-    
-    for lang in languages:
-        lang_dir = registry_dir / lang
-        index_file = lang_dir / 'index.txt'
-        
-        if not index_file.exists():
-            print(f"⚠️  Warning: {index_file} not found, skipping {lang}")
-            continue
-        
-        # 读取文件列表
-        with open(index_file, 'r', encoding='utf-8') as f:
-            file_list = [line.strip() for line in f if line.strip()]
-        
-        print(f"📖 Processing {len(file_list)} files for {lang}...")
-        
-        for filename in file_list:
-            filepath = lang_dir / filename
-            
-            if not filepath.exists():
-                print(f"⚠️  Warning: {filepath} not found, skipping")
-                continue
-            
-            try:
-                # 解析
-                parsed = parse_txt_file(filepath, should_sanitize)
-                
-                # 规范化
-                card = normalize_to_schema(parsed, lang)
-                
-                # 验证
-                errors, warnings = validate_card(card, all_cards)
-                
-                if errors:
-                    invalid_cards.append({
-                        'id': card.get('id', 'unknown'),
-                        'errors': errors,
-                        'card': card
-                    })
-                    print(f"❌ Invalid card: {card.get('id')} - {', '.join(errors)}")
+    groups: Dict[str, List[str]] = {}
+    for term in counts:
+        groups.setdefault(vocabulary_key(term), []).append(term)
+    keys = sorted(groups)
+
+    # 并查集：规范键 → 代表键
+    parent = {key: key for key in keys}
+
+    def find(key: str) -> str:
+        while parent[key] != key:
+            parent[key] = parent[parent[key]]
+            key = parent[key]
+        return key
+
+    if threshold is not None:
+        # 前缀过滤：按全局 trigram 频率从稀到密排序，Jaccard ≥ t 的两词必然在各自
+        # 前 |A| - ⌈t·|A|⌉ + 1 个 trigram 中至少共享一个，只索引 / 查询这部分
+        grams = {key: _key_ngrams(key) for key in keys if len(key) >= ALIAS_MIN_FUZZY_LEN}
+        frequency = Counter(gram for key_grams in grams.values() for gram in key_grams)
+        postings: Dict[str, List[str]] = {}
+        for key in sorted(grams, key=lambda k: (len(grams[k]), k)):
+            key_grams = grams[key]
+            ordered = sorted(key_grams, key=lambda g: (frequency[g], g))
+            prefix = ordered[:len(ordered) - math.ceil(threshold * len(ordered)) + 1]
+            candidates = {other for gram in prefix for other in postings.get(gram, ())}
+            for other in candidates:
+                other_grams = grams[other]
+                if len(other_grams) < threshold * len(key_grams):
+                    continue
+                if _negation_differs(key, other):
+                    continue
+                common = len(key_grams & other_grams)
+                if common / (len(key_grams) + len(other_grams) - common) >= threshold:
+                    a, b = find(key), find(other)
+                    if a != b:
+                        parent[max(a, b)] = min(a, b)
+            for gram in prefix:
+                postings.setdefault(gram, []).append(key)
+
+    members: Dict[str, List[str]] = {}
+    for key in keys:
+        members.setdefault(find(key), []).extend(groups[key])
+
+    aliases = {}
+    for terms in members.values():
+        canonical = min(terms, key=lambda t: (-counts[t], t))
+        for term in terms:
+            if term != canonical:
+                aliases[term] = canonical
+    return dict(sorted(aliases.items()))
+
+
+def load_reviewed_aliases(registry_dir: Path) -> Dict[str, Dict[str, str]]:
+    """读取仓库中人工审核过的别名表 registry/aliases.json：{'tags': {变体: 规范形}, 'domains': {...}}"""
+    alias_file = registry_dir / ALIAS_FILE
+    if not alias_file.exists():
+        return {'tags': {}, 'domains': {}}
+    with open(alias_file, 'r', encoding='utf-8') as f:
+        stored = json.load(f)
+    return {field_name: dict(stored.get(field_name, {})) for field_name in ('tags', 'domains')}
+
+
+def _resolve_aliases(mapping: Dict[str, str]) -> Dict[str, str]:
+    """展开链式别名（a → b → c 记为 a → c），成环的别名忽略"""
+    resolved = {}
+    for variant, canonical in mapping.items():
+        seen = {variant}
+        while canonical in mapping and canonical not in seen:
+            seen.add(canonical)
+            canonical = mapping[canonical]
+        if canonical != variant:
+            resolved[variant] = canonical
+    return dict(sorted(resolved.items()))
+
+
+def build_vocabulary_aliases(
+    cards: List[Dict[str, Any]],
+    threshold: Optional[float] = None,
+    reviewed: Optional[Dict[str, Dict[str, str]]] = None
+) -> Dict[str, Dict[str, str]]:
+    """
+    跨全部卡片与语言建立词表，返回 {'tags': {变体: 规范形}, 'domains': {...}}
+    默认只做规范键归并；reviewed 中人工审核的别名优先；threshold 给定时才应用模糊合并
+    """
+    reviewed = reviewed or {}
+    aliases = {}
+    for field_name in ('tags', 'domains'):
+        counts = Counter(v for card in cards for v in card.get(field_name, []))
+        mapping = build_alias_map(counts, threshold)
+        mapping.update(reviewed.get(field_name, {}))
+        aliases[field_name] = _resolve_aliases(mapping)
+    return aliases
+
+
+def suggest_vocabulary_aliases(
+    cards: List[Dict[str, Any]],
+    threshold: float = ALIAS_SIMILARITY
+) -> Dict[str, Dict[str, str]]:
+    """
+    对已应用别名的卡片做模糊匹配，返回未应用的候选合并 {'tags': {变体: 规范形}, ...}
+    只写入报告，供人工审核后加入 registry/aliases.json
+    """
+    return {
+        field_name: build_alias_map(Counter(v for card in cards for v in card.get(field_name, [])), threshold)
+        for field_name in ('tags', 'domains')
+    }
+
+
+def apply_aliases(cards: List[Dict[str, Any]], aliases: Dict[str, Dict[str, str]]) -> int:
+    """把 tags / domains 替换为规范形并去重（保持顺序），返回被改写的卡片数"""
+    changed = 0
+    for card in cards:
+        rewritten = False
+        for field_name in ('tags', 'domains'):
+            mapping = aliases.get(field_name)
+            values = card.get(field_name)
+            if not mapping or not values or not any(v in mapping for v in values):
+                continue
+            card[field_name] = list(dict.fromkeys(mapping.get(v, v) for v in values))
+            rewritten = True
+        changed += rewritten
+    return changed
+
+
+# ============================================================================
+# 近重复检测：MinHash + LSH（镜像 / 引用错位 / 抄录）
+# ============================================================================
+
+MINHASH_BINS = 128
+MINHASH_BANDS = 32  # 32 × 4 行；相似度约 0.42 时有 50% 概率成为候选
+SHINGLE_SIZE = 5
+NEAR_DUP_THRESHOLD = 0.8
+
+_BIN_BITS = 7  # log2(MINHASH_BINS)
+_VALUE_MASK = (1 << (64 - _BIN_BITS)) - 1
+_EMPTY_BIN = 1 << 64
+_CRC_SEED = 0x9E3779B9
+
+
+def card_shingle_text(card: Dict[str, Any]) -> str:
+    """参与比较的文本：abstract + 全部 layer 的文本块"""
+    parts = [card.get('abstract') or '']
+    for layer in card.get('layers') or []:
+        for block in layer.get('blocks') or []:
+            text = block.get('text')
+            if text:
+                parts.append(text)
+    return '\n'.join(parts)
+
+
+def shingle(text: str, size: int = SHINGLE_SIZE) -> set:
+    """
+    字符 n-gram shingle（中英文通用，无需分词）
+    先折叠空白与大小写，避免排版差异影响相似度；返回 64 位稳定哈希集合
+    """
+    text = re.sub(r'\s+', ' ', text).strip().lower()
+    if not text:
+        return set()
+    grams = {text} if len(text) <= size else {
+        text[i:i + size] for i in range(len(text) - size + 1)
+    }
+    # 两路不同种子的 CRC32 拼成 64 位：稳定（不受 PYTHONHASHSEED 影响）且远快于加密哈希
+    crc32 = zlib.crc32
+    encoded = [g.encode('utf-8') for g in grams]
+    return {(crc32(b) << 32) | crc32(b, _CRC_SEED) for b in encoded}
+
+
+def minhash_signature(shingles: set) -> Tuple[int, ...]:
+    """
+    单置换 MinHash（one permutation hashing）：
+    哈希高位选桶、低位取最小值，每个 shingle 只处理一次；
+    空桶按环形向后借用最近的非空桶（rotation densification）
+    """
+    mins = [_EMPTY_BIN] * MINHASH_BINS
+    shift = 64 - _BIN_BITS
+    for h in shingles:
+        b = h >> shift
+        v = h & _VALUE_MASK
+        if v < mins[b]:
+            mins[b] = v
+
+    if _EMPTY_BIN in mins:
+        original = list(mins)
+        if original.count(_EMPTY_BIN) == MINHASH_BINS:
+            return tuple(mins)
+        for i in range(MINHASH_BINS):
+            if original[i] != _EMPTY_BIN:
+                continue
+            j = 1
+            while original[(i + j) % MINHASH_BINS] == _EMPTY_BIN:
+                j += 1
+            mins[i] = original[(i + j) % MINHASH_BINS] + j * (_VALUE_MASK + 1)
+    return tuple(mins)
+
+
+def _card_signature(card: Dict[str, Any]) -> Optional[Tuple[int, ...]]:
+    pipeline = LANGUAGE_PIPELINES.get(card.get('lang'))
+    tokenize = pipeline.tokenizer if pipeline is not None else shingle
+    shingles = tokenize(card_shingle_text(card))
+    return minhash_signature(shingles) if shingles else None
+
+
+def find_near_duplicates(
+    cards: List[Dict[str, Any]],
+    threshold: float = NEAR_DUP_THRESHOLD,
+    bands: int = MINHASH_BANDS,
+    cache: Optional[Dict[str, Any]] = None,
+    keys: Optional[List[Any]] = None
+) -> List[Dict[str, Any]]:
+    """
+    用 LSH 分桶找出近重复卡片对（同语言与跨语言）
+    只比较落入同一桶的候选对，整体为次二次复杂度；
+    同一 glyph 的不同语言版本是译本，不计入
+    cache：跨构建保留的签名与相似对（keys 与 cards 对齐，常驻进程用）；
+           只为上次没有的 key 计算签名，并只比较涉及这些卡片的候选对
+    返回按相似度降序排列的 [{a, b, similarity, cross_lang}, ...]
+    """
+    if MINHASH_BINS % bands:
+        raise ValueError(f"MINHASH_BINS ({MINHASH_BINS}) must be divisible by bands ({bands})")
+    rows = MINHASH_BINS // bands
+
+    if cache is not None and cache.get('params') != (threshold, bands):
+        cache.clear()
+        cache.update(params=(threshold, bands), signatures={}, pairs={})
+    known = cache['signatures'] if cache is not None else {}
+
+    signatures = []
+    fresh = set()
+    for idx, card in enumerate(cards):
+        key = keys[idx] if cache is not None else None
+        if cache is not None and key in known:
+            signatures.append(known[key])
+        else:
+            signatures.append(_card_signature(card))
+            fresh.add(idx)
+
+    # LSH：每个 band 的签名切片作为桶键；有缓存时只取涉及新卡片的候选对
+    all_fresh = len(fresh) == len(signatures)
+    candidates = set()
+    for band in range(bands):
+        lo = band * rows
+        buckets: Dict[Tuple[int, ...], List[int]] = {}
+        for idx, sig in enumerate(signatures):
+            if sig is not None:
+                buckets.setdefault(sig[lo:lo + rows], []).append(idx)
+        for members in buckets.values():
+            if len(members) < 2:
+                continue
+            if all_fresh:
+                for i, a in enumerate(members):
+                    for b in members[i + 1:]:
+                        candidates.add((a, b))
+            elif not fresh.isdisjoint(members):
+                for i, a in enumerate(members):
+                    for b in members[i + 1:]:
+                        if a in fresh or b in fresh:
+                            candidates.add((a, b))
+
+    # 相似度：新候选对重新计算，两端都未变的相似对直接沿用
+    similar: Dict[Tuple[int, int], float] = {}
+    for a, b in candidates:
+        sig_a, sig_b = signatures[a], signatures[b]
+        similarity = sum(1 for x, y in zip(sig_a, sig_b) if x == y) / MINHASH_BINS
+        if similarity >= threshold:
+            similar[(a, b)] = similarity
+    if cache is not None:
+        index = {key: idx for idx, key in enumerate(keys)}
+        for (key_a, key_b), similarity in cache['pairs'].items():
+            a, b = index.get(key_a), index.get(key_b)
+            if a is not None and b is not None and a not in fresh and b not in fresh:
+                similar[(min(a, b), max(a, b))] = similarity
+        cache['signatures'] = dict(zip(keys, signatures))
+        cache['pairs'] = {(keys[a], keys[b]): similarity for (a, b), similarity in similar.items()}
+
+    pairs = []
+    for (a, b), similarity in similar.items():
+        card_a, card_b = cards[a], cards[b]
+        if card_a.get('glyph') == card_b.get('glyph') and card_a.get('lang') != card_b.get('lang'):
+            continue
+        pairs.append({
+            'a': card_a.get('id'),
+            'b': card_b.get('id'),
+            'similarity': round(similarity, 3),
+            'cross_lang': card_a.get('lang') != card_b.get('lang')
+        })
+
+    pairs.sort(key=lambda p: (-p['similarity'], p['a'], p['b']))
+    return pairs
+
+
+# ============================================================================
+# 语言管线：每种语言的 sanitizer / citation formatter / tokenizer
+# ============================================================================
+#
+# 新增译本语言只需注册一条管线并提供 registry/<lang>/index.txt：
+#   register_language(LanguagePipeline('ja', format_citation_en))
+# schema 的 lang 枚举、--langs 可选值与默认构建语言都随注册表更新。
+# 管线会被传给并行构建的子进程，其中的函数须为模块级函数（可 pickle）。
+
+@dataclass(frozen=True)
+class LanguagePipeline:
+    lang: str
+    citation_formatter: Callable[[str, str, str, str, List[str]], str]  # (citation, card_id, title, epoch_label, fragments)
+    sanitizer: Callable[[str], str] = clean_to_english_punctuation
+    tokenizer: Callable[[str], set] = shingle  # 近重复检测的 shingle 集合
+
+
+LANGUAGE_PIPELINES: Dict[str, LanguagePipeline] = {}
+
+
+def register_language(pipeline: LanguagePipeline):
+    """注册（或替换）一种语言的管线，并让 schema 接受该语言"""
+    global _compiled_card_validator
+    LANGUAGE_PIPELINES[pipeline.lang] = pipeline
+    CARD_SCHEMA['fields']['lang']['enum'] = tuple(LANGUAGE_PIPELINES)
+    _compiled_card_validator = None
+
+
+def get_language_pipeline(lang: str) -> LanguagePipeline:
+    pipeline = LANGUAGE_PIPELINES.get(lang)
+    if pipeline is None:
+        raise ValueError(
+            f"No pipeline registered for language '{lang}' (registered: {', '.join(LANGUAGE_PIPELINES)})"
+        )
+    return pipeline
+
+
+def registered_languages() -> List[str]:
+    return list(LANGUAGE_PIPELINES)
+
+
+register_language(LanguagePipeline('zh', format_citation_zh))
+register_language(LanguagePipeline('en', format_citation_en))
+
+
+def ingest_language(
+    registry_dir: Path,
+    pipeline: LanguagePipeline,
+    should_sanitize: bool = True,
+    failure_cache: Optional[Dict[str, Dict[str, Any]]] = None,
+    cache_dir: Optional[Path] = None,
+    in_worker: bool = False,
+    parsed_cache: Optional[Dict[str, Dict[str, Any]]] = None
+) -> Dict[str, Any]:
+    """
+    解析 + 规范化一种语言的全部源文件（各语言互不依赖，可在子进程中并行）
+    parsed_cache：source → {digest, card: Card}，源文件哈希未变时复用上次的规范化结果
+    （常驻进程用，卡片以 Card 模型常驻；就地更新，并移除该语言已不存在的源）
+    返回 {'lang', 'records', 'log', 'normalizer'}：
+      records：按 index.txt 顺序，{'source', 'digest', 'card'} 或
+               {'source', 'digest', 'failure': {hash, stage, id, errors}}
+      log：控制台输出，由主进程按语言顺序打印，输出与串行构建一致
+      normalizer：子进程中规范化缓存的内容与计数（in_worker 时），由主进程合并
+    """
+    lang = pipeline.lang
+    failure_cache = failure_cache or {}
+    if in_worker:
+        register_language(pipeline)
+        if cache_dir is not None and not any(NORMALIZER_CACHE.tables.values()):
+            NORMALIZER_CACHE.load(cache_dir)
+        NORMALIZER_CACHE.reset_stats()
+        STRING_TABLE.lookups = STRING_TABLE.hits = 0
+
+    result = {'lang': lang, 'records': [], 'log': [], 'normalizer': None}
+    lang_dir = registry_dir / lang
+    index_file = lang_dir / 'index.txt'
+    
+    if not index_file.exists():
+        result['log'].append(f"⚠️  Warning: {index_file} not found, skipping {lang}")
+        return result
+    
+    # 读取文件列表
+    with open(index_file, 'r', encoding='utf-8') as f:
+        file_list = [line.strip() for line in f if line.strip()]
+    
+    result['log'].append(f"📖 Processing {len(file_list)} files for {lang}...")
+    
+    for filename in file_list:
+        filepath = lang_dir / filename
+        source = f"{lang}/{filename}"
+        
+        if not filepath.exists():
+            result['log'].append(f"⚠️  Warning: {filepath} not found, skipping")
+            continue
+        
+        try:
+            digest = source_hash(filepath, should_sanitize)
+        except OSError as e:
+            # 源文件不可读：记为该文件的 parse 失败，不中断整个构建
+            result['log'].append(f"❌ Error processing {filepath}: {e}")
+            result['records'].append({
+                'source': source,
+                'digest': None,
+                'failure': {'hash': None, 'stage': 'parse', 'id': filename, 'errors': [str(e)]}
+            })
+            continue
+        record = {'source': source, 'digest': digest}
+        cached = failure_cache.get(source)
+        if cached and cached['hash'] == digest:
+            # 已知失败且源文件未变：跳过解析
+            result['log'].append(f"⏭️  Cached failure: {source} - {', '.join(cached['errors'])}")
+            record['failure'] = cached
+        elif parsed_cache is not None and parsed_cache.get(source, {}).get('digest') == digest:
+            # 常驻的 Card 模型在构建边界转换为 schema dict
+            record['card'] = parsed_cache[source]['card'].to_dict()
+        else:
+            try:
+                # 解析 + 规范化
+                parsed = parse_txt_file(filepath, should_sanitize, lang)
+                if parsed_cache is not None:
+                    model = normalize_to_model(parsed, lang)
+                    parsed_cache[source] = {'digest': digest, 'card': model}
+                    record['card'] = model.to_dict()
                 else:
-                    all_cards.append(card)
-                    if warnings:
-                        per_card_warnings[card['id']] = warnings
-                    print(f"✅ Processed: {card['id']}")
-            
+                    record['card'] = normalize_to_schema(parsed, lang)
             except Exception as e:
-                print(f"❌ Error processing {filepath}: {e}")
-                invalid_cards.append({
-                    'id': filename,
-                    'errors': [str(e)],
-                    'card': None
+                result['log'].append(f"❌ Error processing {filepath}: {e}")
+                record['failure'] = {'hash': digest, 'stage': 'parse', 'id': filename, 'errors': [str(e)]}
+        result['records'].append(record)
+
+    if parsed_cache is not None:
+        seen = {record['source'] for record in result['records']}
+        for source in [s for s in parsed_cache if s.startswith(f"{lang}/") and s not in seen]:
+            del parsed_cache[source]
+    if in_worker:
+        result['normalizer'] = NORMALIZER_CACHE.export()
+    return result
+
+
+PARALLEL_MIN_SOURCES = 2000  # 少于此数时进程启动开销与冷缓存得不偿失，串行摄取
+
+
+def default_jobs(registry_dir: Path, languages: List[str]) -> int:
+    """按注册表规模选择摄取进程数：小注册表串行（共享规范化缓存与驻留表），大注册表每种语言一个进程"""
+    sources = 0
+    for lang in languages:
+        index_file = registry_dir / lang / 'index.txt'
+        if index_file.exists():
+            with open(index_file, 'r', encoding='utf-8') as f:
+                sources += sum(1 for line in f if line.strip())
+    if sources < PARALLEL_MIN_SOURCES:
+        return 1
+    return min(len(languages), os.cpu_count() or 1)
+
+
+def ingest_languages(
+    registry_dir: Path,
+    pipelines: List[LanguagePipeline],
+    should_sanitize: bool = True,
+    failure_cache: Optional[Dict[str, Dict[str, Any]]] = None,
+    cache_dir: Optional[Path] = None,
+    jobs: int = 1,
+    parsed_cache: Optional[Dict[str, Dict[str, Any]]] = None
+) -> List[Dict[str, Any]]:
+    """
+    各语言并行摄取（jobs > 1 时每种语言一个子进程），结果按 pipelines 顺序返回
+    无法创建进程池时回退为串行；给定 parsed_cache 时在本进程内串行（缓存需就地更新）
+    """
+    if jobs > 1 and len(pipelines) > 1 and parsed_cache is None:
+        try:
+            pool = concurrent.futures.ProcessPoolExecutor(max_workers=min(jobs, len(pipelines)))
+        except (OSError, NotImplementedError) as e:
+            print(f"⚠️  Warning: parallel build unavailable ({e}), building languages sequentially")
+        else:
+            with pool:
+                futures = [
+                    pool.submit(ingest_language, registry_dir, p, should_sanitize, failure_cache, cache_dir, True)
+                    for p in pipelines
+                ]
+                results = [f.result() for f in futures]
+            for result in results:
+                NORMALIZER_CACHE.merge(result['normalizer'])
+                for record in result['records']:
+                    card = record.get('card')
+                    if card is None:
+                        continue
+                    for field_name in INTERNED_CARD_FIELDS:
+                        if field_name in card:
+                            card[field_name] = [STRING_TABLE.adopt(v) for v in card[field_name]]
+            return results
+    return [
+        ingest_language(registry_dir, p, should_sanitize, failure_cache, parsed_cache=parsed_cache)
+        for p in pipelines
+    ]
+
+
+# ============================================================================
+# 引用索引：fragment → cards、entry-id → card，并检查引用完整性
+# ============================================================================
+
+_CITATION_ENTRY_PATTERN = re.compile(r'(?:Entry|語螺語研究登錄項)[:：]?\s*([A-Za-z0-9]+)')
+_CITATION_FRAGMENT_PATTERN = re.compile(r'Fragment-([^,\s;．]+)')
+
+
+def citation_entry_id(citation: str) -> Optional[str]:
+    """从 citation 中取出 Entry ID（与 normalize_citation 的关键词一致）"""
+    match = _CITATION_ENTRY_PATTERN.search(citation or '')
+    return match.group(1) if match else None
+
+
+def citation_fragments(citation: str) -> List[str]:
+    """
+    从 citation 中取出 Fragment ID
+    去掉句末标点；展开简写 Fragment-⟁/041/043/044 → ⟁/041, ⟁/043, ⟁/044
+    """
+    result = []
+    for raw in _CITATION_FRAGMENT_PATTERN.findall(citation or ''):
+        raw = raw.rstrip('.．')
+        prefix, *segments = raw.split('/')
+        if len(segments) > 1:
+            result.extend(f"Fragment-{prefix}/{seg}" for seg in segments if seg)
+        else:
+            result.append(f"Fragment-{raw}")
+    return result
+
+
+def build_reference_index(cards: List[Dict[str, Any]]) -> Tuple[Dict[str, Any], List[Dict[str, Any]]]:
+    """
+    一次遍历构建引用索引，随后按 glyph 分组做跨语言对齐检查
+    返回 (index, problems)
+    - index['fragments']: Fragment ID → [card id, ...]
+    - index['entries']: Entry ID（glyph）→ {'cards': {lang: card id}, 'cited_by': [card id, ...]}
+    - problems: [{card, path, kind, severity, message}, ...]
+    """
+    fragments: Dict[str, List[str]] = {}
+    entries: Dict[str, Dict[str, Any]] = {}
+    cited: List[Tuple[Dict[str, Any], str]] = []
+    fragments_by_glyph: Dict[str, Dict[str, set]] = {}
+    problems: List[Dict[str, Any]] = []
+
+    for card in cards:
+        card_id, glyph, lang = card['id'], card['glyph'], card['lang']
+        entry = entries.setdefault(glyph, {'cards': {}, 'cited_by': []})
+        entry['cards'][lang] = card_id
+
+        # 只索引真正的 Fragment ID（排除 N/A、░ 等占位）
+        own_fragments = {f for f in card.get('fragments', []) if f.startswith('Fragment-')}
+        fragments_by_glyph.setdefault(glyph, {})[lang] = own_fragments
+        for fragment in sorted(own_fragments):
+            fragments.setdefault(fragment, []).append(card_id)
+
+        citation = card.get('citation', '')
+        entry_id = citation_entry_id(citation)
+        if entry_id:
+            cited.append((card, entry_id))
+        for fragment in citation_fragments(citation):
+            if fragment not in own_fragments:
+                problems.append({
+                    'card': card_id,
+                    'path': '$.citation',
+                    'kind': 'dangling_fragment',
+                    'severity': 'warning',
+                    'message': f"citation files under {fragment}, which is not in $.fragments"
                 })
-    
-    # 生成报告
+
+    # Entry ID 必须指向已存在的 glyph，且应为卡片自身的 glyph
+    for card, entry_id in cited:
+        target = entries.get(entry_id)
+        if target is None:
+            problems.append({
+                'card': card['id'],
+                'path': '$.citation',
+                'kind': 'dangling_entry',
+                'severity': 'error',
+                'message': f"cited Entry ID {entry_id} matches no glyph"
+            })
+            continue
+        target['cited_by'].append(card['id'])
+        if entry_id != card['glyph']:
+            problems.append({
+                'card': card['id'],
+                'path': '$.citation',
+                'kind': 'entry_mismatch',
+                'severity': 'error',
+                'message': f"cites Entry ID {entry_id}, but the card's glyph is {card['glyph']}"
+            })
+
+    # 同一 glyph 的各语言版本应登记相同的 fragments
+    for glyph, by_lang in fragments_by_glyph.items():
+        langs = sorted(lang for lang, frags in by_lang.items() if frags)
+        for lang in langs[1:]:
+            base = by_lang[langs[0]]
+            missing = sorted(base - by_lang[lang])
+            extra = sorted(by_lang[lang] - base)
+            if missing or extra:
+                details = []
+                if missing:
+                    details.append(f"missing {', '.join(missing)}")
+                if extra:
+                    details.append(f"extra {', '.join(extra)}")
+                problems.append({
+                    'card': entries[glyph]['cards'][lang],
+                    'path': '$.fragments',
+                    'kind': 'fragment_mismatch',
+                    'severity': 'warning',
+                    'message': f"fragments differ from {entries[glyph]['cards'][langs[0]]}: {'; '.join(details)}"
+                })
+
+    index = {
+        'fragments': dict(sorted(fragments.items())),
+        'entries': dict(sorted(entries.items()))
+    }
+    return index, problems
+
+
+# ============================================================================
+# 序列化后端：orjson / msgspec / 标准库
+# ============================================================================
+#
+# 三个后端在 --pretty（indent=2）与 --compact 两种模式下输出逐字节一致
+# （UTF-8、不转义非 ASCII、键序保持插入顺序）。
+# 唯一已知差异是大指数浮点数的写法（1e+20 vs 1e20），卡片数据不含此类值。
+
+class JsonSerializer:
+    """标准库 json 后端（始终可用）"""
+    name = 'stdlib'
+
+    def dumps(self, obj: Any, pretty: bool = True) -> bytes:
+        if pretty:
+            return json.dumps(obj, ensure_ascii=False, indent=2).encode('utf-8')
+        return json.dumps(obj, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+    def loads(self, data: bytes) -> Any:
+        return json.loads(data)
+
+
+class OrjsonSerializer(JsonSerializer):
+    """orjson 后端：dict 编码最快"""
+    name = 'orjson'
+
+    def dumps(self, obj: Any, pretty: bool = True) -> bytes:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if pretty else 0)
+
+    def loads(self, data: bytes) -> Any:
+        return orjson.loads(data)
+
+
+class MsgspecSerializer(JsonSerializer):
+    """msgspec 后端：解码最快，并支持直接解码为类型化 Struct"""
+    name = 'msgspec'
+
+    def __init__(self):
+        self._encoder = msgspec.json.Encoder()
+        self._decoder = msgspec.json.Decoder()
+
+    def dumps(self, obj: Any, pretty: bool = True) -> bytes:
+        data = self._encoder.encode(obj)
+        return msgspec.json.format(data, indent=2) if pretty else data
+
+    def loads(self, data: bytes) -> Any:
+        return self._decoder.decode(data)
+
+
+SERIALIZERS = {
+    'stdlib': (JsonSerializer, lambda: True),
+    'orjson': (OrjsonSerializer, lambda: orjson is not None),
+    'msgspec': (MsgspecSerializer, lambda: msgspec is not None),
+}
+SERIALIZER_PREFERENCE = ('orjson', 'msgspec', 'stdlib')
+
+
+def available_serializers() -> List[str]:
+    """当前环境可用的后端名称"""
+    return [name for name, (_, available) in SERIALIZERS.items() if available()]
+
+
+def get_serializer(name: str = 'auto') -> JsonSerializer:
+    """
+    按名称取得后端；'auto' 按 SERIALIZER_PREFERENCE 选择第一个已安装的
+    显式指定但未安装时抛出 ValueError
+    """
+    if name == 'auto':
+        name = next(n for n in SERIALIZER_PREFERENCE if SERIALIZERS[n][1]())
+    if name not in SERIALIZERS:
+        raise ValueError(f"Unknown JSON backend: {name}")
+    cls, available = SERIALIZERS[name]
+    if not available():
+        raise ValueError(f"JSON backend '{name}' is not installed")
+    return cls()
+
+
+# ----------------------------------------------------------------------------
+# 类型化卡片 Struct（仅 msgspec 可用时）：供 Python 端直接解码 cards.json
+# ----------------------------------------------------------------------------
+
+if msgspec is not None:
+
+    class EpochStruct(msgspec.Struct, frozen=True):
+        label: str
+        order: int
+
+    class BlockStruct(msgspec.Struct, frozen=True, omit_defaults=True):
+        kind: str
+        text: Optional[str] = None
+        items: Optional[List[Any]] = None
+        headers: Optional[List[Any]] = None
+        rows: Optional[List[List[Any]]] = None
+
+    class LayerStruct(msgspec.Struct, frozen=True, omit_defaults=True):
+        name: str
+        blocks: Optional[List[BlockStruct]] = None  # 懒加载模式下为 None
+        bytes: Optional[int] = None
+
+    class ObservationStruct(msgspec.Struct, frozen=True, omit_defaults=True):
+        visibility: str = 'public'
+        featured: bool = False
+        suppress: List[str] = []
+
+    class OriginStruct(msgspec.Struct, frozen=True, omit_defaults=True):
+        legacy_txt: str = ''
+        migrated_at: str = ''
+
+    class CardStruct(msgspec.Struct, frozen=True, omit_defaults=True):
+        glyph: str
+        id: str
+        lang: str
+        kind: str
+        epoch: EpochStruct
+        weight: int
+        title: str
+        authors: List[str] = []
+        domains: List[str] = []
+        tags: List[str] = []
+        abstract: str = ''
+        scope: List[str] = []
+        citation: str = ''
+        fragments: List[str] = []
+        layers: List[LayerStruct] = []
+        echo: List[Dict[str, Any]] = []
+        observation: ObservationStruct = ObservationStruct()
+        seal: Dict[str, Any] = {}
+        origin: OriginStruct = OriginStruct()
+        research_question: Optional[str] = None
+        method: Optional[str] = None
+        modules: Optional[List[str]] = None
+        layers_src: Optional[str] = None
+
+    _card_list_decoder = msgspec.json.Decoder(List[CardStruct])
+
+
+def load_cards(path: Path, typed: bool = False) -> List[Any]:
+    """
+    读取 cards.json
+    typed=True 时返回类型化卡片：安装了 msgspec 则直接解码为 CardStruct，
+    否则解码后转换为 Card 模型；typed=False 时返回 dict
+    """
+    with open(path, 'rb') as f:
+        data = f.read()
+    if typed:
+        if msgspec is not None:
+            return _card_list_decoder.decode(data)
+        return [Card.from_dict(c) for c in get_serializer('auto').loads(data)]
+    return get_serializer('auto').loads(data)
+
+
+# ============================================================================
+# 容错构建：按源文件哈希缓存失败结果 + 暂存后发布
+# ============================================================================
+
+FAILURE_CACHE_FILE = 'failures.json'
+
+_builder_fingerprint: Optional[bytes] = None
+
+
+def builder_fingerprint() -> bytes:
+    """生成器自身源码的哈希：生成器改动后，失败缓存自动失效"""
+    global _builder_fingerprint
+    if _builder_fingerprint is None:
+        _builder_fingerprint = hashlib.sha256(Path(__file__).read_bytes()).digest()
+    return _builder_fingerprint
+
+
+def source_hash(filepath: Path, should_sanitize: bool = True) -> str:
+    """源文件缓存键：生成器版本 + 清理开关 + 文件内容"""
+    h = hashlib.sha256(builder_fingerprint())
+    h.update(b'sanitize' if should_sanitize else b'raw')
+    h.update(filepath.read_bytes())
+    return h.hexdigest()
+
+
+def load_failure_cache(cache_dir: Path) -> Dict[str, Dict[str, Any]]:
+    """读取失败缓存：source → {hash, stage, id, errors}；缓存损坏时视为空"""
+    cache_file = cache_dir / FAILURE_CACHE_FILE
+    if not cache_file.exists():
+        return {}
+    try:
+        with open(cache_file, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        print(f"⚠️  Warning: failure cache {cache_file} unreadable, ignoring")
+        return {}
+
+
+def save_failure_cache(cache_dir: Path, cache: Dict[str, Dict[str, Any]]):
+    publish_files(cache_dir, {
+        Path(FAILURE_CACHE_FILE): JsonSerializer().dumps(dict(sorted(cache.items())))
+    })
+
+
+def publish_files(output_dir: Path, files: Dict[Path, bytes]):
+    """
+    暂存后发布：先把全部文件写入 output_dir 下的临时目录，全部写成功后再逐个 os.replace 到目标位置
+    每个文件的替换各自是原子的（同一文件系统内），不会留下半写的文件；但整组文件并非原子发布，
+    替换中途崩溃时可能出现新的 cards.json 与旧的 refs.json 等并存，重新构建即可恢复一致
+    """
+    output_dir.mkdir(parents=True, exist_ok=True)
+    staging = Path(tempfile.mkdtemp(prefix='.registry-staging-', dir=output_dir))
+    try:
+        staged = []
+        for rel_path, data in files.items():
+            staged_file = staging / rel_path
+            staged_file.parent.mkdir(parents=True, exist_ok=True)
+            with open(staged_file, 'wb') as f:
+                f.write(data)
+            staged.append((staged_file, output_dir / rel_path))
+        for staged_file, target in staged:
+            target.parent.mkdir(parents=True, exist_ok=True)
+            os.replace(staged_file, target)
+    finally:
+        shutil.rmtree(staging, ignore_errors=True)
+
+
+# ============================================================================
+# 报告：逐卡明细流式写入 JSONL，内存中只保留聚合统计
+# ============================================================================
+
+DETAILS_FILE = 'registry-details.jsonl'
+TOP_OFFENDERS = 20
+REPORT_SAMPLE_LIMIT = 50  # Markdown 中每节最多列出的条目数
+
+
+def default_file_mode() -> int:
+    """按当前 umask 计算普通新建文件的权限（与 open() 创建的文件一致）"""
+    mask = os.umask(0)
+    os.umask(mask)
+    return 0o666 & ~mask
+
+
+def issue_type(message: str) -> str:
+    """
+    把一条 '<path>: <message>' 归一为问题类型，用于计数
+    去掉数组下标与具体取值：$.tags[9]: must match ..., got 'x' → $.tags[]: must match ...
+    """
+    path, _, text = message.partition(': ')
+    if not text:
+        return message
+    path = re.sub(r'\[\d+\]', '[]', path)
+    text = text.split(', got ')[0]
+    if text.startswith('Duplicate '):
+        text = text.split(':')[0]
+    return f"{path}: {text}"
+
+
+def _size_bucket(size: int) -> str:
+    """按 2 的幂分桶：0、1-1023、1024-2047、2048-4095 ..."""
+    if size <= 0:
+        return '0'
+    if size < 1024:
+        return '1-1023'
+    lo = 1 << (size.bit_length() - 1)
+    return f"{lo}-{(lo << 1) - 1}"
+
+
+def _bucket_sort_key(label: str) -> int:
+    return int(label.split('-')[0])
+
+
+class ReportCollector:
+    """
+    构建过程中逐卡接收结果：
+    - 有错误或警告的卡片立即写入 reports/registry-details.jsonl（先写临时文件，close 时原子替换）
+    - 内存中只保留问题类型计数、top offenders（固定大小的堆）、直方图与有限条目的样本
+    """
+
+    def __init__(self, reports_dir: Path, serializer: Optional[JsonSerializer] = None):
+        reports_dir.mkdir(parents=True, exist_ok=True)
+        self.reports_dir = reports_dir
+        self.serializer = serializer or JsonSerializer()
+        self._stream = tempfile.NamedTemporaryFile(
+            'wb', dir=reports_dir, prefix='.registry-details-', suffix='.tmp', delete=False
+        )
+        self.valid = 0
+        self.invalid = 0
+        self.cards_with_warnings = 0
+        self.error_counts: Counter = Counter()
+        self.warning_counts: Counter = Counter()
+        self.weight_histogram: Counter = Counter()
+        self.tags_histogram: Counter = Counter()
+        self.layer_size_histogram: Counter = Counter()
+        self.invalid_sample: List[Dict[str, Any]] = []
+        self._offenders: List[Tuple[int, str]] = []  # (issue_count, card_id) 最小堆
+
+    def _write(self, record: Dict[str, Any]):
+        self._stream.write(self.serializer.dumps(record, False))
+        self._stream.write(b'\n')
+
+    def _track_offender(self, card_id: str, issues: int):
+        if len(self._offenders) < TOP_OFFENDERS:
+            heapq.heappush(self._offenders, (issues, card_id))
+        elif issues > self._offenders[0][0]:
+            heapq.heapreplace(self._offenders, (issues, card_id))
+
+    def card_valid(self, card: Dict[str, Any], source: str, warnings: List[str]):
+        self.valid += 1
+        self.weight_histogram[card['weight']] += 1
+        self.tags_histogram[len(card.get('tags', []))] += 1
+        layer_bytes = sum(
+            len((block.get('text') or '').encode('utf-8'))
+            for layer in card.get('layers', [])
+            for block in layer.get('blocks', [])
+        )
+        self.layer_size_histogram[_size_bucket(layer_bytes)] += 1
+        if warnings:
+            self.cards_with_warnings += 1
+            self.warning_counts.update(issue_type(w) for w in warnings)
+            self._track_offender(card['id'], len(warnings))
+            self._write({'id': card['id'], 'source': source, 'status': 'valid', 'warnings': warnings})
+
+    def card_invalid(self, card_id: str, source: str, stage: str, errors: List[str]):
+        self.invalid += 1
+        self.error_counts.update(issue_type(e) for e in errors)
+        self._track_offender(card_id, len(errors))
+        if len(self.invalid_sample) < REPORT_SAMPLE_LIMIT:
+            self.invalid_sample.append({'id': card_id, 'errors': errors})
+        self._write({'id': card_id, 'source': source, 'status': 'invalid', 'stage': stage, 'errors': errors})
+
+    def close(self) -> Dict[str, Any]:
+        """发布明细文件，返回聚合摘要"""
+        self._stream.close()
+        # NamedTemporaryFile 以 0600 创建，发布前改为与其它报告一致的权限
+        os.chmod(self._stream.name, default_file_mode())
+        os.replace(self._stream.name, self.reports_dir / DETAILS_FILE)
+        return {
+            'valid_cards': self.valid,
+            'invalid_cards': self.invalid,
+            'cards_with_warnings': self.cards_with_warnings,
+            'errors_by_type': dict(self.error_counts.most_common()),
+            'warnings_by_type': dict(self.warning_counts.most_common()),
+            'top_offenders': [
+                {'id': card_id, 'issues': issues}
+                for issues, card_id in sorted(self._offenders, key=lambda o: (-o[0], o[1]))
+            ],
+            'histograms': {
+                'weight': {str(k): v for k, v in sorted(self.weight_histogram.items())},
+                'tags_per_card': {str(k): v for k, v in sorted(self.tags_histogram.items())},
+                'layer_bytes': {
+                    k: v for k, v in sorted(self.layer_size_histogram.items(), key=lambda i: _bucket_sort_key(i[0]))
+                }
+            },
+            'invalid_sample': self.invalid_sample,
+            'details': DETAILS_FILE
+        }
+
+    def abort(self):
+        """构建异常中止时丢弃未完成的明细文件"""
+        self._stream.close()
+        try:
+            os.unlink(self._stream.name)
+        except OSError:
+            pass
+
+
+# ============================================================================
+# 预渲染：abstract / scope / layers → HTML 片段（按卡片内容哈希缓存）
+# ============================================================================
+#
+# 与 index.html 的 highlightCoreSyntax() 逐字节一致，前端可直接注入，
+# 不必在每次筛选时重新转换 markdown。layer 名称额外做了 HTML 转义。
+
+RENDER_CACHE_FILE = 'render.json'
+RENDER_BLOCK_KINDS = ('markdown', 'ascii', 'code')  # 与前端当前渲染的 block 类型一致
+
+_BR_PATTERN = re.compile(r'<br\s*/?>', re.IGNORECASE)
+_BACKTICK_PATTERN = re.compile(r'`([^`]+?)`')
+
+
+def highlight_core_syntax(text: str) -> str:
+    """index.html 中 highlightCoreSyntax() 的 Python 实现：转义 HTML，反引号语素 → codeblock"""
+    if not text:
+        return ''
+    text = _BR_PATTERN.sub('__BR__', text)
+    text = text.replace('&', '&amp;').replace('<', '&lt;').replace('>', '&gt;')
+    text = text.replace('&lt;core&gt;', '%%core%%')
+
+    def replace_backtick(match):
+        inner = match.group(1)
+        if inner == '%%core%%':
+            return '<span class="codeblock green">&lt;core&gt;</span>'
+        return f'<span class="codeblock">{inner}</span>'
+
+    text = _BACKTICK_PATTERN.sub(replace_backtick, text)
+    return text.replace('__BR__', '<br>')
+
+
+def _escape_html(text: str) -> str:
+    return text.replace('&', '&amp;').replace('<', '&lt;').replace('>', '&gt;').replace('"', '&quot;')
+
+
+def render_card_html(card: Dict[str, Any]) -> Dict[str, str]:
+    """渲染单张卡片的 abstract / scope / layers 片段（与前端 filterAndRenderCards 的结构一致）"""
+    scope_text = '<br>'.join(f"- {item}" for item in card.get('scope', []))
+    layer_parts = []
+    for layer in card.get('layers', []):
+        layer_parts.append(f'<div class="card-layer-title">[+ {_escape_html(layer["name"])}]</div>')
+        for block in layer.get('blocks', []):
+            if block.get('kind') in RENDER_BLOCK_KINDS:
+                layer_parts.append(
+                    f'<div class="card-layer-content">{highlight_core_syntax(block.get("text") or "")}</div>'
+                )
+    return {
+        'abstract': highlight_core_syntax(card.get('abstract', '')),
+        'scope': highlight_core_syntax(scope_text),
+        'layers': ''.join(layer_parts)
+    }
+
+
+def card_content_hash(card: Dict[str, Any]) -> str:
+    """
+    卡片内容哈希：规范化 JSON（键排序）的 sha256
+    排除每次构建都会变化的 origin.migrated_at，内容不变则哈希不变
+    """
+    content = dict(card)
+    origin = content.get('origin')
+    if isinstance(origin, dict) and 'migrated_at' in origin:
+        content['origin'] = {k: v for k, v in origin.items() if k != 'migrated_at'}
+    canonical = json.dumps(content, ensure_ascii=False, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+
+def render_cards(
+    cards: List[Dict[str, Any]],
+    cache_dir: Optional[Path] = None
+) -> Tuple[Dict[str, Dict[str, str]], Dict[str, int]]:
+    """
+    渲染全部卡片，返回 ({card id: {hash, abstract, scope, layers}}, {'rendered', 'reused'})
+    cache_dir 不为 None 时复用上次构建中内容哈希相同的片段，并只保留本次用到的缓存项
+    """
+    cache: Dict[str, Dict[str, str]] = {}
+    cache_file = cache_dir / RENDER_CACHE_FILE if cache_dir is not None else None
+    if cache_file is not None and cache_file.exists():
+        try:
+            with open(cache_file, 'r', encoding='utf-8') as f:
+                stored = json.load(f)
+            # 与失败缓存、规范化缓存一样按生成器源码指纹失效：改动渲染规则后自动重新渲染
+            if stored.get('fingerprint') == builder_fingerprint().hex():
+                cache = stored.get('fragments', {})
+        except (OSError, ValueError):
+            print(f"⚠️  Warning: render cache {cache_file} unreadable, ignoring")
+
+    rendered: Dict[str, Dict[str, str]] = {}
+    used: Dict[str, Dict[str, str]] = {}
+    stats = {'rendered': 0, 'reused': 0}
+    for card in cards:
+        digest = card_content_hash(card)
+        fragments = cache.get(digest)
+        if fragments is None:
+            fragments = render_card_html(card)
+            stats['rendered'] += 1
+        else:
+            stats['reused'] += 1
+        used[digest] = fragments
+        rendered[card['id']] = {'hash': digest, **fragments}
+
+    if cache_dir is not None:
+        publish_files(cache_dir, {
+            Path(RENDER_CACHE_FILE): JsonSerializer().dumps(
+                {'fingerprint': builder_fingerprint().hex(), 'fragments': used}, False
+            )
+        })
+    return rendered, stats
+
+
+def prune_render_files(output_dir: Path, languages: List[str]):
+    """未启用 --render-html 时删除上次构建遗留的 render.json，避免前端注入过期片段"""
+    for lang in languages:
+        render_file = output_dir / 'registry' / lang / 'render.json'
+        if render_file.exists():
+            render_file.unlink()
+
+
+# ============================================================================
+# SQLite 导出：规范化表 + facet 索引 + FTS5 全文检索，按内容哈希增量更新
+# ============================================================================
+
+SQLITE_SCHEMA_VERSION = 1
+SQLITE_BATCH_SIZE = 500
+
+_SQLITE_TABLES = '''
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS cards (
+    rowid INTEGER PRIMARY KEY,
+    id TEXT NOT NULL UNIQUE,
+    glyph TEXT NOT NULL,
+    lang TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    title TEXT NOT NULL,
+    weight INTEGER NOT NULL,
+    epoch_label TEXT NOT NULL,
+    epoch_order INTEGER NOT NULL,
+    abstract TEXT NOT NULL,
+    citation TEXT NOT NULL,
+    research_question TEXT,
+    method TEXT,
+    legacy_txt TEXT,
+    content_hash TEXT NOT NULL,
+    json TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_cards_glyph_lang ON cards (glyph, lang);
+CREATE INDEX IF NOT EXISTS idx_cards_lang_epoch ON cards (lang, epoch_order);
+CREATE INDEX IF NOT EXISTS idx_cards_weight ON cards (weight);
+CREATE INDEX IF NOT EXISTS idx_cards_kind ON cards (kind);
+CREATE TABLE IF NOT EXISTS tags (
+    card_id TEXT NOT NULL REFERENCES cards (id) ON DELETE CASCADE,
+    tag TEXT NOT NULL,
+    PRIMARY KEY (card_id, tag)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_tags_tag ON tags (tag);
+CREATE TABLE IF NOT EXISTS domains (
+    card_id TEXT NOT NULL REFERENCES cards (id) ON DELETE CASCADE,
+    domain TEXT NOT NULL,
+    PRIMARY KEY (card_id, domain)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_domains_domain ON domains (domain);
+CREATE TABLE IF NOT EXISTS authors (
+    card_id TEXT NOT NULL REFERENCES cards (id) ON DELETE CASCADE,
+    author TEXT NOT NULL,
+    PRIMARY KEY (card_id, author)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_authors_author ON authors (author);
+CREATE TABLE IF NOT EXISTS fragments (
+    card_id TEXT NOT NULL REFERENCES cards (id) ON DELETE CASCADE,
+    fragment TEXT NOT NULL,
+    PRIMARY KEY (card_id, fragment)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_fragments_fragment ON fragments (fragment);
+CREATE TABLE IF NOT EXISTS layers (
+    card_id TEXT NOT NULL REFERENCES cards (id) ON DELETE CASCADE,
+    position INTEGER NOT NULL,
+    name TEXT NOT NULL,
+    text TEXT NOT NULL,
+    PRIMARY KEY (card_id, position)
+) WITHOUT ROWID;
+'''
+
+_FACET_TABLES = (
+    ('tags', 'tag', 'tags'),
+    ('domains', 'domain', 'domains'),
+    ('authors', 'author', 'authors'),
+    ('fragments', 'fragment', 'fragments'),
+)
+
+
+def _create_fts(conn: sqlite3.Connection) -> Optional[str]:
+    """
+    创建 FTS5 表（rowid 与 cards.rowid 对齐）
+    优先 trigram 分词（中文无需分词即可子串检索），不支持时退回 unicode61；
+    SQLite 未编译 FTS5 时返回 None
+    """
+    row = conn.execute("SELECT value FROM meta WHERE key = 'fts_tokenizer'").fetchone()
+    if row:
+        return row[0]
+    for tokenizer in ('trigram', 'unicode61'):
+        try:
+            conn.execute(
+                "CREATE VIRTUAL TABLE cards_fts USING fts5("
+                f"title, abstract, scope, citation, layers, tokenize='{tokenizer}')"
+            )
+        except sqlite3.OperationalError:
+            continue
+        conn.execute("INSERT INTO meta (key, value) VALUES ('fts_tokenizer', ?)", (tokenizer,))
+        return tokenizer
+    print("⚠️  Warning: SQLite has no FTS5 support, skipping full-text index")
+    return None
+
+
+def _layer_text(layer: Dict[str, Any]) -> str:
+    return '\n\n'.join(b.get('text') or '' for b in layer.get('blocks', []) if b.get('text'))
+
+
+def export_sqlite(
+    cards: List[Dict[str, Any]],
+    db_path: Path,
+    languages: Optional[List[str]] = None
+) -> Dict[str, int]:
+    """
+    把卡片导出到单个 SQLite 文件
+    按 card_content_hash 增量更新：内容未变的卡片不重写，已删除的卡片移除
+    （languages 不为 None 时只清理这些语言的卡片，其它语言保持不动）；
+    写入按 SQLITE_BATCH_SIZE 张一批提交事务
+    返回 {'inserted', 'updated', 'unchanged', 'deleted'}
+    """
+    db_path.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(db_path)
+    stats = {'inserted': 0, 'updated': 0, 'unchanged': 0, 'deleted': 0}
+    try:
+        conn.execute("PRAGMA foreign_keys = ON")
+        conn.execute("PRAGMA journal_mode = WAL")
+        conn.executescript(_SQLITE_TABLES)
+        row = conn.execute("SELECT value FROM meta WHERE key = 'schema_version'").fetchone()
+        if row and int(row[0]) != SQLITE_SCHEMA_VERSION:
+            raise ValueError(
+                f"{db_path} has schema version {row[0]}, expected {SQLITE_SCHEMA_VERSION}; delete it to re-export"
+            )
+        conn.execute(
+            "INSERT OR REPLACE INTO meta (key, value) VALUES ('schema_version', ?)",
+            (str(SQLITE_SCHEMA_VERSION),)
+        )
+        has_fts = _create_fts(conn) is not None
+        conn.commit()
+
+        if languages is None:
+            existing = dict(conn.execute("SELECT id, content_hash FROM cards"))
+        else:
+            placeholders = ', '.join('?' for _ in languages)
+            existing = dict(conn.execute(
+                f"SELECT id, content_hash FROM cards WHERE lang IN ({placeholders})", languages
+            ))
+        current_ids = set()
+        pending = 0
+
+        for card in cards:
+            card_id = card['id']
+            current_ids.add(card_id)
+            digest = card_content_hash(card)
+            previous = existing.get(card_id)
+            if previous == digest:
+                stats['unchanged'] += 1
+                continue
+            if previous is not None:
+                _delete_card_rows(conn, card_id, has_fts)
+                stats['updated'] += 1
+            else:
+                stats['inserted'] += 1
+            _insert_card_rows(conn, card, digest, has_fts)
+            pending += 1
+            if pending >= SQLITE_BATCH_SIZE:
+                conn.commit()
+                pending = 0
+
+        for card_id in existing.keys() - current_ids:
+            _delete_card_rows(conn, card_id, has_fts)
+            stats['deleted'] += 1
+        conn.commit()
+    finally:
+        conn.close()
+    return stats
+
+
+def _delete_card_rows(conn: sqlite3.Connection, card_id: str, has_fts: bool):
+    """删除一张卡片（facet / layers 经外键级联删除）"""
+    if has_fts:
+        row = conn.execute("SELECT rowid FROM cards WHERE id = ?", (card_id,)).fetchone()
+        if row:
+            conn.execute("DELETE FROM cards_fts WHERE rowid = ?", (row[0],))
+    conn.execute("DELETE FROM cards WHERE id = ?", (card_id,))
+
+
+def _insert_card_rows(conn: sqlite3.Connection, card: Dict[str, Any], digest: str, has_fts: bool):
+    card_id = card['id']
+    epoch = card.get('epoch', {})
+    cursor = conn.execute(
+        "INSERT INTO cards (id, glyph, lang, kind, title, weight, epoch_label, epoch_order, abstract, "
+        "citation, research_question, method, legacy_txt, content_hash, json) "
+        "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+        (
+            card_id, card['glyph'], card['lang'], card['kind'], card['title'], card['weight'],
+            epoch.get('label', ''), epoch.get('order', 0), card.get('abstract', ''),
+            card.get('citation', ''), card.get('research_question'), card.get('method'),
+            card.get('origin', {}).get('legacy_txt'), digest,
+            json.dumps(card, ensure_ascii=False, separators=(',', ':'))
+        )
+    )
+    for table, column, key in _FACET_TABLES:
+        conn.executemany(
+            f"INSERT OR IGNORE INTO {table} (card_id, {column}) VALUES (?, ?)",
+            [(card_id, value) for value in card.get(key, [])]
+        )
+    layers = card.get('layers', [])
+    conn.executemany(
+        "INSERT INTO layers (card_id, position, name, text) VALUES (?, ?, ?, ?)",
+        [(card_id, i, layer['name'], _layer_text(layer)) for i, layer in enumerate(layers)]
+    )
+    if has_fts:
+        conn.execute(
+            "INSERT INTO cards_fts (rowid, title, abstract, scope, citation, layers) VALUES (?, ?, ?, ?, ?, ?)",
+            (
+                cursor.lastrowid, card['title'], card.get('abstract', ''),
+                '\n'.join(card.get('scope', [])), card.get('citation', ''),
+                '\n\n'.join(f"{layer['name']}\n{_layer_text(layer)}" for layer in layers)
+            )
+        )
+
+
+# ============================================================================
+# 懒加载输出：layer 正文与卡片元数据分离
+# ============================================================================
+#
+# 拆分后 cards.json 中的卡片：
+#   "layers": [{"name": "...", "bytes": 1234}, ...]   # bytes = layer 文本的 UTF-8 字节数
+#   "layers_src": "layers/SSL-en.json"               # 相对于 registry/{lang}/
+# layers/<id>.json：{"id": "...", "layers": [完整 layer], "html": "..."（启用 --render-html 时）}
+
+LAYERS_DIR = 'layers'
+
+
+def layer_file_name(card_id: str) -> str:
+    """
+    卡片 id → 文件名
+    id 含非安全字符时替换为 _ 并附加 id 哈希前缀，避免 'a/b' 与 'a_b' 映射到同一文件
+    """
+    safe = re.sub(r'[^\w.-]', '_', card_id)
+    if safe != card_id:
+        safe = f"{safe}-{hashlib.sha256(card_id.encode('utf-8')).hexdigest()[:8]}"
+    return safe + '.json'
+
+
+def split_card_layers(card: Dict[str, Any]) -> Tuple[Dict[str, Any], Optional[Dict[str, Any]]]:
+    """
+    拆分卡片：返回 (元数据卡片, layer 文件内容)
+    没有 layer 的卡片原样返回，layer 文件为 None
+    """
+    layers = card.get('layers') or []
+    if not layers:
+        return card, None
+    stub = dict(card)
+    stub['layers'] = [
+        {
+            'name': layer['name'],
+            'bytes': sum(len((b.get('text') or '').encode('utf-8')) for b in layer.get('blocks', []))
+        }
+        for layer in layers
+    ]
+    stub['layers_src'] = f"{LAYERS_DIR}/{layer_file_name(card['id'])}"
+    return stub, {'id': card['id'], 'layers': layers}
+
+
+def prune_layer_files(output_dir: Path, languages: List[str], published: Dict[Path, bytes]):
+    """删除本次构建未输出的 layer 文件（已不存在的卡片，或未启用 --split-layers 时的全部遗留文件）"""
+    for lang in languages:
+        layers_dir = output_dir / 'registry' / lang / LAYERS_DIR
+        if not layers_dir.is_dir():
+            continue
+        for path in layers_dir.glob('*.json'):
+            if Path('registry') / lang / LAYERS_DIR / path.name not in published:
+                path.unlink()
+        if not any(layers_dir.iterdir()):
+            layers_dir.rmdir()
+
+
+def load_card_layers(cards_path: Path, card: Any) -> List[Any]:
+    """
+    按需读取一张卡片的完整 layers
+    cards_path 为该卡片所在的 cards.json；未拆分的卡片直接返回自身的 layers
+    card 可以是 dict、Card 模型或 CardStruct
+    """
+    if isinstance(card, dict):
+        layers_src, layers = card.get('layers_src'), card.get('layers', [])
+    elif isinstance(card, Card):
+        layers_src, layers = (card.extra or {}).get('layers_src'), card.layers
+    else:
+        layers_src, layers = getattr(card, 'layers_src', None), card.layers
+    if not layers_src:
+        return layers
+    with open(cards_path.parent / layers_src, 'rb') as f:
+        return get_serializer('auto').loads(f.read())['layers']
+
+
+# ============================================================================
+# 主生成器
+# ============================================================================
+
+def build_registry(
+    registry_dir: Path,
+    output_dir: Path,
+    should_sanitize: bool = True,
+    languages: Optional[List[str]] = None,
+    near_dup_threshold: Optional[float] = NEAR_DUP_THRESHOLD,
+    serializer: Optional[JsonSerializer] = None,
+    pretty: bool = True,
+    cache_dir: Optional[Path] = None,
+    resilient: bool = False,
+    render_html: bool = False,
+    sqlite_path: Optional[Path] = None,
+    split_layers: bool = False,
+    alias_similarity: Optional[float] = None,
+    canonicalize: bool = True,
+    jobs: Optional[int] = None,
+    parsed_cache: Optional[Dict[str, Dict[str, Any]]] = None,
+    output_hashes: Optional[Dict[str, str]] = None,
+    validation_cache: Optional[Dict[Any, List[Violation]]] = None,
+    near_dup_cache: Optional[Dict[str, Any]] = None,
+    persist_normalizer: bool = True
+) -> Dict[str, Any]:
+    """
+    构建注册表
+    返回报告数据
+
+    cache_dir：构建缓存目录（默认 <output_dir>/.registry-cache）
+    resilient：启用失败缓存，源文件哈希未变且上次失败的卡片直接复用失败结果，不再解析
+    render_html：输出预渲染 HTML 片段 registry/{lang}/render.json
+    sqlite_path：同时导出 SQLite 数据库（增量更新）
+    split_layers：layer 正文拆分为 registry/{lang}/layers/<id>.json，供按需加载
+    alias_similarity：直接应用 tag / domain 模糊归并的 trigram Jaccard 阈值（默认 None：只按规范键
+                      与 registry_dir/aliases.json 中审核过的别名归并，模糊匹配只作为建议写入报告）
+    canonicalize：是否应用 tag / domain 别名表（输出 registry/aliases.applied.json）
+    languages：构建的语言（默认全部已注册的语言管线）
+    jobs：并行摄取的进程数（默认：源文件不少于 PARALLEL_MIN_SOURCES 时每种语言一个，否则串行）
+    parsed_cache：跨构建保留的解析结果（source → {digest, card: Card}），常驻进程用
+    output_hashes：跨构建保留的输出哈希（相对路径 → sha256），给定时只重写内容变化的文件；
+                   本次写出的文件列在 report['published']
+    validation_cache / near_dup_cache：跨构建保留的逐卡 schema 检查结果与 MinHash 签名 / 相似对，
+                   按 (source, 源文件哈希) 索引，常驻进程用
+    persist_normalizer：是否在构建前后读写磁盘上的规范化缓存（常驻进程改为在启动 / 退出时读写）
+    """
+    if cache_dir is None:
+        cache_dir = output_dir / '.registry-cache'
+    if languages is None:
+        languages = registered_languages()
+    pipelines = [get_language_pipeline(lang) for lang in languages]
+    if jobs is None:
+        jobs = default_jobs(registry_dir, languages)
+    
+    serializer = serializer or JsonSerializer()
+    candidates = []
+    candidate_sources = []
+    all_cards = []
+    failures = []
+    collector = ReportCollector(output_dir / 'reports', serializer)
+    try:
+        failure_cache = load_failure_cache(cache_dir) if resilient and cache_dir is not None else {}
+        next_failure_cache = {}
+        NORMALIZER_CACHE.reset_stats()
+        if cache_dir is not None and persist_normalizer:
+            NORMALIZER_CACHE.load(cache_dir)
+        
+        # 摄取：每种语言独立解析 + 规范化（可并行），卡片在摄取时即按语言分区
+        cards_by_lang: Dict[str, List[Dict[str, Any]]] = {lang: [] for lang in languages}
+        ingested = ingest_languages(
+            registry_dir, pipelines, should_sanitize, failure_cache, cache_dir, jobs, parsed_cache
+        )
+        for result in ingested:
+            for line in result['log']:
+                print(line)
+            for record in result['records']:
+                source, digest = record['source'], record['digest']
+                failure = record.get('failure')
+                if failure is None:
+                    candidates.append(record['card'])
+                    candidate_sources.append((source, digest, result['lang']))
+                    continue
+                collector.card_invalid(failure['id'], source, failure['stage'], failure['errors'])
+                failures.append({
+                    'source': source,
+                    'source_hash': digest,
+                    'stage': failure['stage'],
+                    'id': failure['id'],
+                    'errors': failure['errors']
+                })
+                next_failure_cache[source] = failure
+        
+        # 验证：编译后的 schema 对全部卡片做一次批量检查
+        validate = get_card_validator()
+        candidate_keys = [(source, digest) for source, digest, _ in candidate_sources]
+        results = validate_cards(candidates, validation_cache, candidate_keys)
+        if validation_cache is not None:
+            for key in set(validation_cache) - set(candidate_keys):
+                del validation_cache[key]
+        all_keys = []
+        for card, key, (source, digest, lang), (errors, warnings) in zip(candidates, candidate_keys, candidate_sources, results):
+            if errors:
+                card_id = card.get('id', 'unknown')
+                collector.card_invalid(card_id, source, 'validate', errors)
+                failures.append({
+                    'source': source,
+                    'source_hash': digest,
+                    'stage': 'validate',
+                    'id': card_id,
+                    'errors': errors
+                })
+                # 只缓存卡片自身的 schema 错误；重复 id 取决于其它文件，不可按单文件哈希缓存
+                intrinsic = [format_violation(v) for v in validate(card) if v[0] == 'error']
+                if intrinsic:
+                    next_failure_cache[source] = {'hash': digest, 'stage': 'validate', 'id': card_id, 'errors': intrinsic}
+                print(f"❌ Invalid card: {card_id} - {', '.join(errors)}")
+            else:
+                all_cards.append(card)
+                all_keys.append(key)
+                cards_by_lang[lang].append(card)
+                collector.card_valid(card, source, warnings)
+                print(f"✅ Processed: {card['id']}")
+        
+        if resilient:
+            save_failure_cache(cache_dir, next_failure_cache)
+        if cache_dir is not None and persist_normalizer:
+            NORMALIZER_CACHE.save(cache_dir)
+        
+        normalizer_stats = NORMALIZER_CACHE.stats()
+        print(
+            f"🧠 Normalizer cache: {normalizer_stats['hit_rate']:.1%} hit rate "
+            f"({normalizer_stats['hits']} hits / {normalizer_stats['misses']} misses, "
+            f"{normalizer_stats['memory_bytes'] / 1024:.1f} KB), "
+            f"{normalizer_stats['intern']['strings']} interned strings"
+        )
+        
+        # 词表规范化：跨语言归并 tag / domain 变体
+        aliases: Dict[str, Dict[str, str]] = {'tags': {}, 'domains': {}}
+        alias_suggestions: Dict[str, Dict[str, str]] = {'tags': {}, 'domains': {}}
+        vocabulary_stats = {}
+        if canonicalize:
+            aliases = build_vocabulary_aliases(all_cards, alias_similarity, load_reviewed_aliases(registry_dir))
+            rewritten = apply_aliases(all_cards, aliases)
+            for field_name, mapping in aliases.items():
+                for variant, canonical in mapping.items():
+                    print(f"🏷️  Alias ({field_name}): {variant} → {canonical}")
+            alias_suggestions = suggest_vocabulary_aliases(all_cards)
+            for field_name, mapping in alias_suggestions.items():
+                for variant, canonical in mapping.items():
+                    print(f"💡 Alias suggestion ({field_name}): {variant} → {canonical}")
+            for field_name in ('tags', 'domains'):
+                vocabulary_stats[field_name] = {
+                    'terms': len({v for c in all_cards for v in c.get(field_name, [])}) + len(aliases[field_name]),
+                    'aliases': len(aliases[field_name]),
+                    'suggestions': len(alias_suggestions[field_name])
+                }
+            vocabulary_stats['cards_rewritten'] = rewritten
+            vocabulary_stats['reviewed_file'] = (registry_dir / ALIAS_FILE).as_posix()
+        
+        # 近重复检测（同语言与跨语言）
+        near_duplicates = []
+        if near_dup_threshold is not None:
+            near_duplicates = find_near_duplicates(
+                all_cards, near_dup_threshold, cache=near_dup_cache, keys=all_keys
+            )
+            for pair in near_duplicates:
+                print(f"🪞 Near-duplicate: {pair['a']} ≈ {pair['b']} ({pair['similarity']:.2f})")
+        
+        # 引用索引与完整性检查
+        reference_index, reference_problems = build_reference_index(all_cards)
+        for problem in reference_problems:
+            icon = '❌' if problem['severity'] == 'error' else '⚠️ '
+            print(f"{icon} Reference {problem['kind']}: {problem['card']} - {problem['message']}")
+        
+        # 生成报告（逐卡明细已流式写入 JSONL，这里只保留聚合结果）
+        summary = collector.close()
+    except BaseException:
+        collector.abort()
+        raise
     report = {
         'total_cards': len(all_cards),
-        'invalid_cards': len(invalid_cards),
-        'invalid_details': invalid_cards,
-        'warnings': per_card_warnings,
-        'duplicates': []  # 已在验证中处理
+        'invalid_cards': summary['invalid_cards'],
+        'summary': summary,
+        'near_duplicates': near_duplicates,
+        'reference_errors': reference_problems,
+        'alias_suggestions': alias_suggestions,
+        'failures': sorted(failures, key=lambda f: f['source']),
+        'stats': {'normalizer_cache': normalizer_stats, 'vocabulary': vocabulary_stats},
+        'cards': all_cards  # 有效卡片（不写入报告文件，供调用方如常驻进程使用）
     }
     
-    # 写入 JSON 文件（按语言分组）
-    output_dir.mkdir(parents=True, exist_ok=True)
+    # 预渲染 HTML 片段（可选）
+    rendered: Dict[str, Dict[str, str]] = {}
+    if render_html:
+        rendered, render_stats = render_cards(all_cards, cache_dir)
+        print(f"🖼️  Rendered HTML: {render_stats['rendered']} rendered, {render_stats['reused']} reused from cache")
+    
+    # 写入 JSON 文件（按语言分组），全部输出暂存后一起发布
+    outputs: Dict[Path, bytes] = {}
     
     for lang in languages:
-        lang_cards = [c for c in all_cards if c.get('lang') == lang]
-        
         # 排序：按 epoch.order, 然后按 glyph
-        lang_cards.sort(key=lambda c: (c['epoch']['order'], c['glyph']))
+        lang_cards = sorted(cards_by_lang[lang], key=lambda c: (c['epoch']['order'], c['glyph']))
+        
+        lang_rendered = {c['id']: rendered[c['id']] for c in lang_cards if c['id'] in rendered}
+        if render_html:
+            # 前端只在 content_hash 与 render.json 中的 hash 一致时使用预渲染片段
+            lang_cards = [dict(c, content_hash=rendered[c['id']]['hash']) for c in lang_cards]
         
-        output_file = output_dir / 'registry' / lang / 'cards.json'
-        output_file.parent.mkdir(parents=True, exist_ok=True)
+        # 懒加载模式：layer 正文拆分到 layers/<id>.json，cards.json 只保留名称与字节数
+        if split_layers:
+            stubs = []
+            for card in lang_cards:
+                stub, layer_file = split_card_layers(card)
+                stubs.append(stub)
+                if layer_file is None:
+                    continue
+                fragments = lang_rendered.get(card['id'])
+                if fragments is not None:
+                    layer_file['html'] = fragments['layers']
+                    lang_rendered[card['id']] = {k: v for k, v in fragments.items() if k != 'layers'}
+                outputs[Path('registry') / lang / stub['layers_src']] = serializer.dumps(layer_file, pretty)
+            lang_cards = stubs
         
-        with open(output_file, 'w', encoding='utf-8') as f:
-            json.dump(lang_cards, f, ensure_ascii=False, indent=2)
+        outputs[Path('registry') / lang / 'cards.json'] = serializer.dumps(lang_cards, pretty)
+        print(f"💾 Wrote {len(lang_cards)} cards to {output_dir / 'registry' / lang / 'cards.json'}")
         
-        print(f"💾 Wrote {len(lang_cards)} cards to {output_file}")
+        if render_html:
+            outputs[Path('registry') / lang / 'render.json'] = serializer.dumps(lang_rendered, pretty)
+    
+    outputs[Path('registry') / 'refs.json'] = serializer.dumps(reference_index, pretty)
+    print(f"🔗 Wrote reference index to {output_dir / 'registry' / 'refs.json'}")
+    
+    if canonicalize:
+        outputs[Path('registry') / APPLIED_ALIAS_FILE] = serializer.dumps(aliases, pretty)
+    
+    # 输出不得覆盖审核过的别名表：否则一次 --alias-similarity 构建的模糊合并会在之后被当作已审核
+    reviewed_file = (registry_dir / ALIAS_FILE).resolve()
+    for rel_path in outputs:
+        if (output_dir / rel_path).resolve() == reviewed_file:
+            raise ValueError(f"Refusing to overwrite reviewed alias file {reviewed_file} with build output {rel_path}")
+    
+    published = outputs
+    if output_hashes is not None:
+        hashes = {rel_path.as_posix(): hashlib.sha256(data).hexdigest() for rel_path, data in outputs.items()}
+        published = {
+            rel_path: data for rel_path, data in outputs.items()
+            if output_hashes.get(rel_path.as_posix()) != hashes[rel_path.as_posix()]
+            or not (output_dir / rel_path).exists()
+        }
+        output_hashes.clear()
+        output_hashes.update(hashes)
+    publish_files(output_dir, published)
+    report['published'] = sorted(rel_path.as_posix() for rel_path in published)
+    prune_layer_files(output_dir, languages, outputs)
+    if not render_html:
+        prune_render_files(output_dir, languages)
+    
+    # SQLite 导出（可选）
+    if sqlite_path is not None:
+        sqlite_stats = export_sqlite(all_cards, sqlite_path, languages)
+        print(
+            f"🗄️  SQLite {sqlite_path}: {sqlite_stats['inserted']} inserted, {sqlite_stats['updated']} updated, "
+            f"{sqlite_stats['unchanged']} unchanged, {sqlite_stats['deleted']} deleted"
+        )
     
     return report
 
 
-def write_reports(report: Dict[str, Any], output_dir: Path):
+def write_reports(
+    report: Dict[str, Any],
+    output_dir: Path,
+    serializer: Optional[JsonSerializer] = None,
+    pretty: bool = True
+):
     """写入报告文件"""
     reports_dir = output_dir / 'reports'
     reports_dir.mkdir(parents=True, exist_ok=True)
     
-    # JSON 报告
+    summary = report['summary']
+    
+    # JSON 报告：聚合统计；逐卡明细见 registry-details.jsonl
     json_report = {
         'total_cards': report['total_cards'],
         'invalid_cards': report['invalid_cards'],
-        'invalid_details': report['invalid_details'],
-        'warnings': report['warnings']
+        'summary': summary,
+        'near_duplicates': report.get('near_duplicates', []),
+        'reference_errors': report.get('reference_errors', []),
+        'alias_suggestions': report.get('alias_suggestions', {}),
+        'stats': report.get('stats', {})
+    }
+    
+    serializer = serializer or JsonSerializer()
+    
+    # 失败报告：按源文件排序、不含时间戳，CI 可直接 diff
+    failure_report = {
+        'failed_sources': len(report.get('failures', [])),
+        'failures': report.get('failures', [])
     }
     
-    with open(reports_dir / 'registry-validate.json', 'w', encoding='utf-8') as f:
-        json.dump(json_report, f, ensure_ascii=False, indent=2)
+    outputs = {
+        Path('registry-validate.json'): serializer.dumps(json_report, pretty),
+        Path('registry-failures.json'): serializer.dumps(failure_report, pretty)
+    }
     
-    # Markdown 报告
+    def append_limited(lines: List[str], total: int):
+        """超过 REPORT_SAMPLE_LIMIT 的条目只给出数量，Markdown 体积与卡片数无关"""
+        if total > REPORT_SAMPLE_LIMIT:
+            lines.append(f"_… {total - REPORT_SAMPLE_LIMIT} more, see `{summary['details']}`_")
+        lines.append("")
+    
+    # Markdown 报告（有界摘要）
     md_lines = [
         "# Spiral Registry Validation Report",
         "",
         f"**Total Cards**: {report['total_cards']}",
         f"**Invalid Cards**: {report['invalid_cards']}",
+        f"**Cards With Warnings**: {summary['cards_with_warnings']}",
+        f"**Per-card Details**: `{summary['details']}`",
         "",
         "## Invalid Cards",
         ""
     ]
     
-    if report['invalid_details']:
-        for item in report['invalid_details']:
+    if summary['invalid_sample']:
+        for item in summary['invalid_sample']:
             md_lines.append(f"### {item['id']}")
             md_lines.append("**Errors:**")
             for error in item['errors']:
                 md_lines.append(f"- {error}")
             md_lines.append("")
+        append_limited(md_lines, report['invalid_cards'])
     else:
         md_lines.append("✅ No invalid cards found.")
         md_lines.append("")
     
-    md_lines.append("## Warnings")
+    for title, counts in (("Errors by Type", summary['errors_by_type']),
+                          ("Warnings by Type", summary['warnings_by_type'])):
+        md_lines.append(f"## {title}")
+        md_lines.append("")
+        if counts:
+            md_lines.append("| Type | Count |")
+            md_lines.append("|---|---|")
+            for kind, count in list(counts.items())[:REPORT_SAMPLE_LIMIT]:
+                md_lines.append(f"| {kind} | {count} |")
+            append_limited(md_lines, len(counts))
+        else:
+            md_lines.append("✅ None.")
+            md_lines.append("")
+    
+    md_lines.append("## Top Offenders")
     md_lines.append("")
     
-    if report['warnings']:
-        for card_id, warnings in report['warnings'].items():
-            md_lines.append(f"### {card_id}")
-            for warning in warnings:
-                md_lines.append(f"- {warning}")
-            md_lines.append("")
+    if summary['top_offenders']:
+        md_lines.append("| Card | Issues |")
+        md_lines.append("|---|---|")
+        for offender in summary['top_offenders']:
+            md_lines.append(f"| {offender['id']} | {offender['issues']} |")
+        md_lines.append("")
+    else:
+        md_lines.append("✅ None.")
+        md_lines.append("")
+    
+    md_lines.append("## Histograms")
+    md_lines.append("")
+    
+    for name, histogram in summary['histograms'].items():
+        md_lines.append(f"### {name}")
+        md_lines.append("")
+        md_lines.append("| Bucket | Cards |")
+        md_lines.append("|---|---|")
+        for bucket, count in histogram.items():
+            md_lines.append(f"| {bucket} | {count} |")
+        md_lines.append("")
+    
+    md_lines.append("## Near Duplicates")
+    md_lines.append("")
+    
+    near_duplicates = report.get('near_duplicates', [])
+    if near_duplicates:
+        md_lines.append("| Card A | Card B | Similarity | Cross-lang |")
+        md_lines.append("|---|---|---|---|")
+        for pair in near_duplicates[:REPORT_SAMPLE_LIMIT]:
+            cross = 'yes' if pair['cross_lang'] else 'no'
+            md_lines.append(f"| {pair['a']} | {pair['b']} | {pair['similarity']:.2f} | {cross} |")
+        append_limited(md_lines, len(near_duplicates))
     else:
-        md_lines.append("✅ No warnings.")
+        md_lines.append("✅ No near-duplicate cards.")
+        md_lines.append("")
+    
+    md_lines.append("## Reference Integrity")
+    md_lines.append("")
+    
+    reference_errors = report.get('reference_errors', [])
+    if reference_errors:
+        for problem in reference_errors[:REPORT_SAMPLE_LIMIT]:
+            md_lines.append(
+                f"- **{problem['severity']}** `{problem['kind']}` {problem['card']} "
+                f"({problem['path']}): {problem['message']}"
+            )
+        append_limited(md_lines, len(reference_errors))
+    else:
+        md_lines.append("✅ All references resolve.")
+        md_lines.append("")
+    
+    alias_suggestions = [
+        (field_name, variant, canonical)
+        for field_name, mapping in report.get('alias_suggestions', {}).items()
+        for variant, canonical in mapping.items()
+    ]
+    if alias_suggestions:
+        md_lines.append("## Alias Suggestions")
+        md_lines.append("")
+        reviewed_file = report.get('stats', {}).get('vocabulary', {}).get('reviewed_file', f"registry/{ALIAS_FILE}")
+        md_lines.append(f"Fuzzy matches not applied; add reviewed ones to `{reviewed_file}`.")
+        md_lines.append("")
+        md_lines.append("| Field | Variant | Canonical |")
+        md_lines.append("|---|---|---|")
+        for field_name, variant, canonical in alias_suggestions[:REPORT_SAMPLE_LIMIT]:
+            md_lines.append(f"| {field_name} | {variant} | {canonical} |")
+        append_limited(md_lines, len(alias_suggestions))
+    
+    vocabulary_stats = report.get('stats', {}).get('vocabulary')
+    normalizer_stats = report.get('stats', {}).get('normalizer_cache')
+    if vocabulary_stats or normalizer_stats:
+        md_lines.append("## Build Stats")
+        md_lines.append("")
+    if vocabulary_stats:
+        for field_name in ('tags', 'domains'):
+            row = vocabulary_stats[field_name]
+            md_lines.append(
+                f"**Vocabulary ({field_name})**: {row['terms']} terms, "
+                f"{row['aliases']} merged into canonical forms, {row['suggestions']} suggested"
+            )
+        md_lines.append(f"**Cards Rewritten**: {vocabulary_stats['cards_rewritten']}")
+        md_lines.append("")
+    if normalizer_stats:
+        md_lines.append(
+            f"**Normalizer Cache**: {normalizer_stats['hit_rate']:.1%} hit rate, "
+            f"{normalizer_stats['memory_bytes']} bytes"
+        )
+        md_lines.append("")
+        md_lines.append("| Function | Hits | Misses | Evictions | Entries | Hit rate |")
+        md_lines.append("|---|---|---|---|---|---|")
+        for name, row in normalizer_stats['functions'].items():
+            md_lines.append(
+                f"| `{name}` | {row['hits']} | {row['misses']} | {row['evictions']} "
+                f"| {row['entries']} | {row['hit_rate']:.1%} |"
+            )
+        md_lines.append("")
+        intern_stats = normalizer_stats['intern']
+        md_lines.append(
+            f"**Intern Table**: {intern_stats['strings']} strings, {intern_stats['hits']}/{intern_stats['lookups']} "
+            f"lookups shared, {intern_stats['memory_bytes']} bytes"
+        )
         md_lines.append("")
     
-    with open(reports_dir / 'registry-validate.md', 'w', encoding='utf-8') as f:
-        f.write('\n'.join(md_lines))
+    outputs[Path('registry-validate.md')] = '\n'.join(md_lines).encode('utf-8')
+    publish_files(reports_dir, outputs)
     
     print(f"📊 Reports written to {reports_dir}")
 
@@ -914,6 +3452,20 @@ def write_reports(report: Dict[str, Any], output_dir: Path):
 # CLI
 # ============================================================================
 
+def build_status(report: Dict[str, Any], resilient: bool = False, strict_refs: bool = False) -> Tuple[int, str]:
+    """构建结论：(退出码, 说明)，CLI 与常驻进程共用"""
+    reference_errors = [p for p in report['reference_errors'] if p['severity'] == 'error']
+    if report['invalid_cards'] > 0 and not resilient:
+        return 1, f"❌ Build failed: {report['invalid_cards']} invalid cards"
+    if strict_refs and reference_errors:
+        # --resilient 只放过无效卡片，不放过引用错误
+        return 1, f"❌ Build failed: {len(reference_errors)} reference errors"
+    if report['invalid_cards'] > 0:
+        return 0, (f"⚠️  Partial build: {report['total_cards']} cards published, "
+                   f"{report['invalid_cards']} failed (see reports/registry-failures.json)")
+    return 0, f"✅ Build successful: {report['total_cards']} cards"
+
+
 def main():
     parser = argparse.ArgumentParser(description='Spiral Registry Builder v2')
     parser.add_argument(
@@ -936,8 +3488,96 @@ def main():
     parser.add_argument(
         '--langs',
         nargs='+',
-        default=['zh', 'en'],
-        help='Languages to process (default: zh en)'
+        choices=registered_languages(),
+        default=None,
+        help=f"Languages to process (default: all registered: {' '.join(registered_languages())})"
+    )
+    parser.add_argument(
+        '--jobs',
+        type=int,
+        default=None,
+        help=f'Worker processes for per-language ingestion (default: one per language for registries of '
+             f'{PARALLEL_MIN_SOURCES}+ sources, otherwise 1 = sequential)'
+    )
+    
+    parser.add_argument(
+        '--near-dup-threshold',
+        type=float,
+        default=NEAR_DUP_THRESHOLD,
+        help=f'MinHash similarity threshold for near-duplicate cards (default: {NEAR_DUP_THRESHOLD})'
+    )
+    parser.add_argument(
+        '--no-near-dup',
+        action='store_true',
+        help='Disable near-duplicate detection'
+    )
+    
+    parser.add_argument(
+        '--strict-refs',
+        action='store_true',
+        help='Fail the build on dangling or mismatched Entry ID references'
+    )
+    
+    parser.add_argument(
+        '--json-backend',
+        choices=['auto'] + list(SERIALIZERS),
+        default='auto',
+        help='JSON encoder backend (default: auto = orjson > msgspec > stdlib)'
+    )
+    format_group = parser.add_mutually_exclusive_group()
+    format_group.add_argument(
+        '--pretty',
+        dest='pretty',
+        action='store_true',
+        default=True,
+        help='Write indented JSON (default)'
+    )
+    format_group.add_argument(
+        '--compact',
+        dest='pretty',
+        action='store_false',
+        help='Write compact JSON without whitespace'
+    )
+    
+    parser.add_argument(
+        '--resilient',
+        action='store_true',
+        help='Publish all valid cards and exit 0 even if some cards fail; cache known failures by source hash'
+    )
+    parser.add_argument(
+        '--cache-dir',
+        type=Path,
+        default=None,
+        help='Build cache directory (default: <output-dir>/.registry-cache)'
+    )
+    parser.add_argument(
+        '--sqlite',
+        type=Path,
+        default=None,
+        metavar='PATH',
+        help='Also export the registry to a SQLite database (tables + FTS5), updated incrementally'
+    )
+    parser.add_argument(
+        '--split-layers',
+        action='store_true',
+        help='Move layer bodies into registry/{lang}/layers/<id>.json for on-demand loading'
+    )
+    parser.add_argument(
+        '--alias-similarity',
+        type=float,
+        default=None,
+        help='Also apply fuzzy tag/domain merges at this trigram Jaccard threshold '
+             f'(default: off; matches at {ALIAS_SIMILARITY} are only reported as suggestions)'
+    )
+    parser.add_argument(
+        '--no-canonicalize',
+        action='store_true',
+        help='Keep tags and domains as written (no alias map)'
+    )
+    parser.add_argument(
+        '--render-html',
+        action='store_true',
+        help='Pre-render abstract/scope/layers into registry/{lang}/render.json'
     )
     
     args = parser.parse_args()
@@ -947,27 +3587,45 @@ def main():
     print("🜂 Spiral Registry Builder v2")
     print(f"📁 Registry: {args.registry_dir}")
     print(f"📤 Output: {args.output_dir}")
+    try:
+        serializer = get_serializer(args.json_backend)
+    except ValueError as e:
+        parser.error(str(e))
+    
     print(f"🧹 Sanitize: {should_sanitize}")
+    print(f"🧾 JSON: {serializer.name} ({'pretty' if args.pretty else 'compact'})")
     print("")
     
     # 构建
-    report = build_registry(
-        args.registry_dir,
-        args.output_dir,
-        should_sanitize,
-        args.langs
-    )
+    try:
+        report = build_registry(
+            args.registry_dir,
+            args.output_dir,
+            should_sanitize,
+            args.langs,
+            None if args.no_near_dup else args.near_dup_threshold,
+            serializer,
+            args.pretty,
+            args.cache_dir,
+            args.resilient,
+            args.render_html,
+            args.sqlite,
+            args.split_layers,
+            args.alias_similarity,
+            not args.no_canonicalize,
+            args.jobs
+        )
+    except ValueError as e:
+        print(f"❌ {e}")
+        exit(1)
     
     # 写入报告
-    write_reports(report, args.output_dir)
+    write_reports(report, args.output_dir, serializer, args.pretty)
     
     # 退出码
-    if report['invalid_cards'] > 0:
-        print(f"\n❌ Build failed: {report['invalid_cards']} invalid cards")
-        exit(1)
-    else:
-        print(f"\n✅ Build successful: {report['total_cards']} cards")
-        exit(0)
+    code, message = build_status(report, args.resilient, args.strict_refs)
+    print(f"\n{message}")
+    exit(code)
 
 
 if __name__ == '__main__':
@@ -0,0 +1,545 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Spiral Registry Build Daemon
+常驻构建进程：解析结果、验证结果、近似重复签名、规范化缓存与输出哈希常驻内存，通过本地 Unix socket 提供
+rebuild / rebuild-one / query / validate 操作，省去每次构建的解释器启动与冷解析
+"""
+
+import io
+import sys
+import json
+import time
+import socket
+import argparse
+import threading
+import contextlib
+import socketserver
+from pathlib import Path
+from collections import deque
+from typing import Dict, List, Tuple, Any, Optional
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+import registry_build as rb
+
+DEFAULT_SOCKET = Path('.registry-daemon.sock')
+LATENCY_WINDOW = 1024  # 每种操作保留最近的延迟样本数
+QUERY_LIMIT = 50
+
+
+# ============================================================================
+# 常驻状态
+# ============================================================================
+
+class DaemonState:
+    """
+    跨请求保留的构建状态：
+      parsed_cache：source → {digest, card: Card}，源文件未变时不再解析
+      output_hashes：输出文件哈希，只重写内容变化的文件
+      validation_cache / near_dup_cache：逐卡 schema 检查结果与 MinHash 签名 / 相似对，
+                                         按 (source, 源文件哈希) 索引，未变的卡片不再重算
+      cards / id_sources / glyph_sources：上次构建的有效卡片（按 id，Card 模型）
+                                         与 id → source、(glyph, lang) → source 索引
+    规范化缓存（NORMALIZER_CACHE）启动时从 cache_dir 载入一次，close() 时写回，请求之间不读写磁盘
+    卡片以 Card 模型常驻内存，只在构建、验证与响应的边界转换为 schema dict
+    """
+
+    def __init__(
+        self,
+        registry_dir: Path,
+        output_dir: Path,
+        should_sanitize: bool = True,
+        languages: Optional[List[str]] = None,
+        serializer: Optional[rb.JsonSerializer] = None,
+        pretty: bool = True,
+        cache_dir: Optional[Path] = None,
+        resilient: bool = False,
+        render_html: bool = False,
+        sqlite_path: Optional[Path] = None,
+        split_layers: bool = False,
+        near_dup_threshold: Optional[float] = rb.NEAR_DUP_THRESHOLD,
+        alias_similarity: Optional[float] = None,
+        canonicalize: bool = True,
+        strict_refs: bool = False
+    ):
+        self.registry_dir = registry_dir
+        self.output_dir = output_dir
+        self.should_sanitize = should_sanitize
+        self.languages = languages or rb.registered_languages()
+        self.serializer = serializer or rb.JsonSerializer()
+        self.pretty = pretty
+        self.cache_dir = cache_dir or output_dir / '.registry-cache'
+        self.resilient = resilient
+        self.render_html = render_html
+        self.sqlite_path = sqlite_path
+        self.split_layers = split_layers
+        self.near_dup_threshold = near_dup_threshold
+        self.alias_similarity = alias_similarity
+        self.canonicalize = canonicalize
+        self.strict_refs = strict_refs
+
+        self.parsed_cache: Dict[str, Dict[str, Any]] = {}
+        self.output_hashes: Dict[str, str] = {}
+        self.validation_cache: Dict[Any, List[rb.Violation]] = {}
+        self.near_dup_cache: Dict[str, Any] = {}
+        self.cards: Dict[str, rb.Card] = {}
+        self.id_sources: Dict[str, str] = {}
+        self.glyph_sources: Dict[Tuple[str, str], str] = {}
+        self.report: Optional[Dict[str, Any]] = None
+        self.started = time.time()
+        self.latencies: Dict[str, deque] = {}
+        with contextlib.redirect_stdout(io.StringIO()):
+            rb.NORMALIZER_CACHE.load(self.cache_dir)
+
+    def close(self):
+        """写回常驻的规范化缓存，下次启动（或 CLI 构建）可直接复用"""
+        rb.NORMALIZER_CACHE.save(self.cache_dir)
+
+    # ------------------------------------------------------------------
+    # 操作
+    # ------------------------------------------------------------------
+
+    def rebuild(self, force: List[str] = (), verbose: bool = False) -> Dict[str, Any]:
+        """完整构建；force 中的源强制重新解析，其余未变的源直接复用"""
+        for source in force:
+            self.parsed_cache.pop(source, None)
+        before = dict(self.parsed_cache)
+
+        log = io.StringIO()
+        with contextlib.redirect_stdout(log):
+            report = rb.build_registry(
+                self.registry_dir,
+                self.output_dir,
+                self.should_sanitize,
+                self.languages,
+                self.near_dup_threshold,
+                serializer=self.serializer,
+                pretty=self.pretty,
+                cache_dir=self.cache_dir,
+                resilient=self.resilient,
+                render_html=self.render_html,
+                sqlite_path=self.sqlite_path,
+                split_layers=self.split_layers,
+                alias_similarity=self.alias_similarity,
+                canonicalize=self.canonicalize,
+                jobs=1,
+                parsed_cache=self.parsed_cache,
+                output_hashes=self.output_hashes,
+                validation_cache=self.validation_cache,
+                near_dup_cache=self.near_dup_cache,
+                persist_normalizer=False
+            )
+            rb.write_reports(report, self.output_dir, self.serializer, self.pretty)
+
+        self.report = report
+        self.cards = {card['id']: rb.Card.from_dict(card) for card in report['cards']}
+        self.id_sources, self.glyph_sources = {}, {}
+        for source, entry in self.parsed_cache.items():
+            card = entry['card']
+            self.id_sources.setdefault(card.id, source)
+            self.glyph_sources.setdefault((card.glyph, card.lang), source)
+        reparsed = [s for s, entry in self.parsed_cache.items() if before.get(s) is not entry]
+
+        result = self._build_summary(report)
+        result['exit_code'], result['status'] = rb.build_status(report, self.resilient, self.strict_refs)
+        result['reparsed'] = sorted(reparsed)
+        result['published'] = report['published']
+        if verbose:
+            result['log'] = log.getvalue()
+        return result
+
+    def rebuild_one(self, source: Optional[str] = None, card_id: Optional[str] = None, verbose: bool = False) -> Dict[str, Any]:
+        """强制重新解析一个源（按 source 或卡片 id 指定），其余源复用；只重写变化的输出"""
+        source = source or self.id_sources.get(card_id)
+        if source is None:
+            raise KeyError(f"unknown card id '{card_id}'")
+        return self.rebuild([source], verbose)
+
+    def query(
+        self,
+        card_id: Optional[str] = None,
+        tag: Optional[str] = None,
+        domain: Optional[str] = None,
+        author: Optional[str] = None,
+        lang: Optional[str] = None,
+        text: Optional[str] = None,
+        limit: int = QUERY_LIMIT
+    ) -> Dict[str, Any]:
+        """按 id 返回卡片；否则按 tag / domain / author / lang / 文本过滤，返回匹配的 id"""
+        if card_id is not None:
+            card = self.cards.get(card_id)
+            if card is None:
+                raise KeyError(f"unknown card id '{card_id}'")
+            return {'card': card.to_dict(), 'source': self.id_sources.get(card_id)}
+
+        needle = text.casefold() if text else None
+        matches = []
+        for card in self.cards.values():
+            if tag is not None and tag not in card.tags:
+                continue
+            if domain is not None and domain not in card.domains:
+                continue
+            if author is not None and author not in card.authors:
+                continue
+            if lang is not None and card.lang != lang:
+                continue
+            if needle is not None and needle not in f"{card.title}\n{card.abstract}".casefold():
+                continue
+            matches.append(card.id)
+        matches.sort()
+        return {'count': len(matches), 'ids': matches[:limit]}
+
+    def validate(self, source: Optional[str] = None) -> Dict[str, Any]:
+        """
+        只验证、不发布
+        给定 source 时只重新解析并检查该文件：schema 检查只针对这一张卡片，
+        唯一性（id、(glyph, lang)）查上次构建的索引；
+        否则对全部源（复用未变的解析结果与逐卡检查结果）做一次批量验证
+        """
+        if source is not None:
+            lang = source.split('/', 1)[0]
+            filepath = self.registry_dir / source
+            card = rb.normalize_to_schema(rb.parse_txt_file(filepath, self.should_sanitize, lang), lang)
+            violations = list(rb.get_card_validator()(card))
+            card_id, glyph = card.get('id'), card.get('glyph')
+            if card_id and self.id_sources.get(card_id, source) != source:
+                violations.append(('error', '$.id', f"Duplicate id: {card_id}"))
+            if glyph and self.glyph_sources.get((glyph, lang), source) != source:
+                violations.append(('error', '$.glyph', f"Duplicate (glyph, lang): ({glyph}, {lang})"))
+            errors = [rb.format_violation(v) for v in violations if v[0] == 'error']
+            warnings = [rb.format_violation(v) for v in violations if v[0] == 'warning']
+            return {
+                'invalid_cards': 1 if errors else 0,
+                'cards': [{'source': source, 'id': card['id'], 'errors': errors, 'warnings': warnings}]
+            }
+
+        pipelines = [rb.get_language_pipeline(lang) for lang in self.languages]
+        with contextlib.redirect_stdout(io.StringIO()):
+            ingested = rb.ingest_languages(
+                self.registry_dir, pipelines, self.should_sanitize, parsed_cache=self.parsed_cache
+            )
+        candidates, keys, issues = [], [], []
+        for result in ingested:
+            for record in result['records']:
+                if 'failure' in record:
+                    failure = record['failure']
+                    issues.append({'source': record['source'], 'id': failure['id'], 'errors': failure['errors'], 'warnings': []})
+                else:
+                    candidates.append((record['source'], record['card']))
+                    keys.append((record['source'], record['digest']))
+        results = rb.validate_cards([card for _, card in candidates], self.validation_cache, keys)
+        for (source, card), (errors, warnings) in zip(candidates, results):
+            if errors or warnings:
+                issues.append({'source': source, 'id': card.get('id'), 'errors': errors, 'warnings': warnings})
+        return {
+            'total_cards': len(candidates),
+            'invalid_cards': sum(1 for issue in issues if issue['errors']),
+            'cards': sorted(issues, key=lambda issue: issue['source'])
+        }
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'uptime_s': round(time.time() - self.started, 1),
+            'cards': len(self.cards),
+            'parsed_sources': len(self.parsed_cache),
+            'validation_cache': len(self.validation_cache),
+            'near_dup_signatures': len(self.near_dup_cache.get('signatures', {})),
+            'requests': {op: latency_summary(samples) for op, samples in sorted(self.latencies.items())},
+            'normalizer_cache': rb.NORMALIZER_CACHE.stats()
+        }
+
+    # ------------------------------------------------------------------
+
+    def record_latency(self, op: str, seconds: float):
+        self.latencies.setdefault(op, deque(maxlen=LATENCY_WINDOW)).append(seconds)
+
+    @staticmethod
+    def _build_summary(report: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            'total_cards': report['total_cards'],
+            'invalid_cards': report['invalid_cards'],
+            'reference_errors': sum(1 for p in report['reference_errors'] if p['severity'] == 'error'),
+            'near_duplicates': len(report['near_duplicates']),
+            'failures': report['failures']
+        }
+
+
+def latency_summary(samples: deque) -> Dict[str, Any]:
+    """最近 LATENCY_WINDOW 次请求的延迟统计（毫秒）"""
+    ordered = sorted(samples)
+    count = len(ordered)
+    return {
+        'count': count,
+        'mean_ms': round(sum(ordered) / count * 1000, 3),
+        'p50_ms': round(ordered[count // 2] * 1000, 3),
+        'p95_ms': round(ordered[min(count - 1, int(count * 0.95))] * 1000, 3),
+        'max_ms': round(ordered[-1] * 1000, 3)
+    }
+
+
+# ============================================================================
+# Unix socket 服务：每行一个 JSON 请求，每行一个 JSON 响应
+# ============================================================================
+#
+# 请求：{"op": "rebuild" | "rebuild-one" | "query" | "validate" | "stats" | "shutdown", ...}
+# 响应：{"ok": true, "result": {...}, "latency_ms": 1.23} 或 {"ok": false, "error": "...", "latency_ms": ...}
+# 每个连接一个线程，编辑器可长期保持连接而不阻塞其它客户端；
+# 请求本身在 DaemonServer.lock 下串行执行：构建会替换 stdout 捕获日志，且共享同一份常驻状态。
+
+def dispatch(state: DaemonState, request: Dict[str, Any]) -> Any:
+    op = request.get('op')
+    if op == 'rebuild':
+        return state.rebuild(verbose=request.get('verbose', False))
+    if op == 'rebuild-one':
+        return state.rebuild_one(request.get('source'), request.get('id'), request.get('verbose', False))
+    if op == 'query':
+        return state.query(
+            request.get('id'), request.get('tag'), request.get('domain'), request.get('author'),
+            request.get('lang'), request.get('text'), request.get('limit', QUERY_LIMIT)
+        )
+    if op == 'validate':
+        return state.validate(request.get('source'))
+    if op == 'stats':
+        return state.stats()
+    if op == 'shutdown':
+        return {'stopping': True}
+    raise ValueError(f"unknown op '{op}'")
+
+
+class RequestHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        state: DaemonState = self.server.state
+        for line in self.rfile:
+            if not line.strip():
+                continue
+            start = time.perf_counter()
+            op = None
+            with self.server.lock:
+                try:
+                    request = json.loads(line)
+                    op = request.get('op')
+                    response = {'ok': True, 'result': dispatch(state, request)}
+                except Exception as e:
+                    response = {'ok': False, 'error': f"{type(e).__name__}: {e}"}
+                elapsed = time.perf_counter() - start
+                state.record_latency(op or 'invalid', elapsed)
+                icon = '✅' if response['ok'] else '❌'
+                print(f"{icon} {op or 'invalid'} {elapsed * 1000:.1f} ms")
+            response['latency_ms'] = round(elapsed * 1000, 3)
+            self.wfile.write(json.dumps(response, ensure_ascii=False).encode('utf-8') + b'\n')
+            self.wfile.flush()
+            if op == 'shutdown':
+                # serve_forever 在主线程中运行，这里（处理线程）可直接停止
+                self.server.shutdown()
+                return
+
+
+class DaemonServer(socketserver.ThreadingUnixStreamServer):
+    daemon_threads = True  # 停止时不等待仍保持连接的客户端
+
+    def __init__(self, socket_path: Path, state: DaemonState):
+        self.state = state
+        self.lock = threading.Lock()
+        super().__init__(str(socket_path), RequestHandler)
+
+
+def send_request(socket_path: Path, request: Dict[str, Any], timeout: Optional[float] = None) -> Dict[str, Any]:
+    """发送一个请求并等待响应"""
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.settimeout(timeout)
+        sock.connect(str(socket_path))
+        sock.sendall(json.dumps(request, ensure_ascii=False).encode('utf-8') + b'\n')
+        with sock.makefile('rb') as f:
+            line = f.readline()
+    if not line:
+        raise ConnectionError(f"daemon at {socket_path} closed the connection")
+    return json.loads(line)
+
+
+def daemon_running(socket_path: Path) -> bool:
+    try:
+        send_request(socket_path, {'op': 'stats'}, timeout=1.0)
+        return True
+    except (OSError, ValueError):
+        return False
+
+
+def serve(args):
+    if not hasattr(socket, 'AF_UNIX'):
+        print("❌ Unix sockets are not available on this platform")
+        exit(1)
+    socket_path = args.socket
+    if socket_path.exists():
+        if daemon_running(socket_path):
+            print(f"❌ A daemon is already listening on {socket_path}")
+            exit(1)
+        socket_path.unlink()  # 上次异常退出遗留的 socket 文件
+
+    try:
+        serializer = rb.get_serializer(args.json_backend)
+    except ValueError as e:
+        print(f"❌ {e}")
+        exit(1)
+
+    state = DaemonState(
+        args.registry_dir,
+        args.output_dir,
+        not args.no_sanitize,
+        args.langs,
+        serializer,
+        args.pretty,
+        args.cache_dir,
+        args.resilient,
+        args.render_html,
+        args.sqlite,
+        args.split_layers,
+        None if args.no_near_dup else args.near_dup_threshold,
+        args.alias_similarity,
+        not args.no_canonicalize,
+        args.strict_refs
+    )
+
+    print("🜂 Spiral Registry Build Daemon")
+    print(f"📁 Registry: {args.registry_dir}")
+    print(f"📤 Output: {args.output_dir}")
+    start = time.perf_counter()
+    try:
+        summary = state.rebuild()
+    except ValueError as e:
+        print(f"❌ {e}")
+        exit(1)
+    print(f"🔥 Warm-up build: {summary['total_cards']} cards, {summary['invalid_cards']} invalid "
+          f"({(time.perf_counter() - start) * 1000:.0f} ms)")
+    print(f"   {summary['status']}")
+
+    with DaemonServer(socket_path, state) as server:
+        print(f"🛰️  Listening on {socket_path}")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            socket_path.unlink(missing_ok=True)
+            state.close()
+    print("👋 Daemon stopped")
+
+
+def client(args):
+    request: Dict[str, Any] = {'op': args.command}
+    if args.command in ('rebuild', 'rebuild-one'):
+        request['verbose'] = args.verbose
+    if args.command == 'rebuild-one':
+        request['source' if '/' in args.target else 'id'] = args.target
+    elif args.command == 'validate' and args.source:
+        request['source'] = args.source
+    elif args.command == 'query':
+        for key in ('id', 'tag', 'domain', 'author', 'lang', 'text', 'limit'):
+            value = getattr(args, key)
+            if value is not None:
+                request[key] = value
+
+    start = time.perf_counter()
+    try:
+        response = send_request(args.socket, request)
+    except OSError as e:
+        print(f"❌ Cannot reach daemon at {args.socket}: {e}")
+        exit(1)
+    round_trip = (time.perf_counter() - start) * 1000
+
+    result = response.get('result')
+    if isinstance(result, dict) and 'log' in result:
+        print(result.pop('log'), end='')
+    print(json.dumps(response, ensure_ascii=False, indent=2))
+    print(f"⏱️  {args.command}: {response['latency_ms']:.1f} ms in daemon, {round_trip:.1f} ms round trip")
+
+    if not response['ok']:
+        exit(1)
+    if isinstance(result, dict):
+        # rebuild 按与 CLI 构建相同的规则给出退出码（--resilient / --strict-refs）
+        if 'exit_code' in result:
+            exit(result['exit_code'])
+        if result.get('invalid_cards', 0) > 0:
+            exit(1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Spiral Registry build daemon')
+    parser.add_argument(
+        '--socket',
+        type=Path,
+        default=DEFAULT_SOCKET,
+        help=f'Unix socket path (default: {DEFAULT_SOCKET})'
+    )
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    serve_parser = commands.add_parser('serve', help='Start the daemon (runs a warm-up build first)')
+    serve_parser.add_argument('--registry-dir', type=Path, default=Path('registry'), help='Registry directory (default: registry)')
+    serve_parser.add_argument('--output-dir', type=Path, default=Path('.'), help='Output directory (default: . (project root))')
+    serve_parser.add_argument('--no-sanitize', action='store_true', help='Disable punctuation sanitization')
+    serve_parser.add_argument(
+        '--langs',
+        nargs='+',
+        choices=rb.registered_languages(),
+        default=None,
+        help=f"Languages to process (default: all registered: {' '.join(rb.registered_languages())})"
+    )
+    serve_parser.add_argument(
+        '--json-backend',
+        choices=['auto'] + list(rb.SERIALIZERS),
+        default='auto',
+        help='JSON serializer backend (default: auto)'
+    )
+    serve_parser.add_argument('--compact', dest='pretty', action='store_false', help='Write compact JSON')
+    serve_parser.add_argument('--cache-dir', type=Path, default=None, help='Build cache directory (default: <output-dir>/.registry-cache)')
+    serve_parser.add_argument('--resilient', action='store_true', help='Publish valid cards even when some cards fail')
+    serve_parser.add_argument('--render-html', action='store_true', help='Also write pre-rendered HTML fragments')
+    serve_parser.add_argument('--split-layers', action='store_true', help='Move layer bodies into per-card files')
+    serve_parser.add_argument('--sqlite', type=Path, default=None, metavar='PATH', help='Also export to a SQLite database')
+    serve_parser.add_argument(
+        '--near-dup-threshold',
+        type=float,
+        default=rb.NEAR_DUP_THRESHOLD,
+        help=f'MinHash similarity threshold for near-duplicate cards (default: {rb.NEAR_DUP_THRESHOLD})'
+    )
+    serve_parser.add_argument('--no-near-dup', action='store_true', help='Disable near-duplicate detection')
+    serve_parser.add_argument('--strict-refs', action='store_true', help='Fail rebuilds on dangling or mismatched Entry ID references')
+    serve_parser.add_argument(
+        '--alias-similarity',
+        type=float,
+        default=None,
+        help='Also apply fuzzy tag/domain merges at this trigram Jaccard threshold (default: off)'
+    )
+    serve_parser.add_argument('--no-canonicalize', action='store_true', help='Keep tags and domains as written (no alias map)')
+
+    for name, help_text in (('rebuild', 'Rebuild, reparsing only changed sources'),
+                            ('rebuild-one', 'Force-reparse one source (lang/file.txt) or card id, then rebuild')):
+        sub = commands.add_parser(name, help=help_text)
+        if name == 'rebuild-one':
+            sub.add_argument('target', help='Source path relative to the registry (e.g. en/SPIRAL_SovereigntySystemLaw_en.txt) or card id')
+        sub.add_argument('--verbose', action='store_true', help='Print the build log')
+
+    query_parser = commands.add_parser('query', help='Query cards of the last build')
+    query_parser.add_argument('--id', default=None, help='Return the full card with this id')
+    query_parser.add_argument('--tag', default=None)
+    query_parser.add_argument('--domain', default=None)
+    query_parser.add_argument('--author', default=None)
+    query_parser.add_argument('--lang', default=None)
+    query_parser.add_argument('--text', default=None, help='Case-insensitive substring of title or abstract')
+    query_parser.add_argument('--limit', type=int, default=None, help=f'Maximum ids returned (default: {QUERY_LIMIT})')
+
+    validate_parser = commands.add_parser('validate', help='Validate without publishing')
+    validate_parser.add_argument('source', nargs='?', default=None, help='Only this source (lang/file.txt), checked against the loaded cards')
+
+    commands.add_parser('stats', help='Request latencies and cache statistics')
+    commands.add_parser('shutdown', help='Stop the daemon')
+
+    args = parser.parse_args()
+    if args.command == 'serve':
+        serve(args)
+    else:
+        client(args)
+
+
+if __name__ == '__main__':
+    main()
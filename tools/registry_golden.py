@@ -0,0 +1,324 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Spiral Registry Golden Harness
+解析 / 规范化回归基线：真实语料 + 格式漂移模糊语料，逐字节比较规范化输出并统计各阶段耗时
+"""
+
+import re
+import sys
+import time
+import random
+import hashlib
+import difflib
+import argparse
+import tempfile
+from pathlib import Path
+from typing import Dict, List, Any, Callable, Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+import registry_build as rb
+
+# 计时的生成器阶段（包含关系：parse_txt_file ⊃ sanitize_text，
+# normalize_to_schema ⊃ normalize_citation）
+STAGES = (
+    'parse_txt_file',
+    'sanitize_text',
+    'normalize_to_schema',
+    'normalize_citation',
+    'validate_cards'
+)
+DIFF_CONTEXT_LINES = 40
+
+
+# ============================================================================
+# 格式漂移变体：每个变体把一份 TXT 源改写成解析器声称可以容忍的写法
+# ============================================================================
+
+def map_field(text: str, key: str, fn: Callable[[str], str]) -> str:
+    """改写 [Key] 的值（同一行及后续直到下一个 [ 开头的行）"""
+    pattern = re.compile(r'^(\[' + re.escape(key) + r'\])([^\n]*(?:\n(?!\[)[^\n]*)*)', re.M)
+    return pattern.sub(lambda m: m.group(1) + fn(m.group(2)), text, count=1)
+
+
+def _star_count(value: str) -> int:
+    return value.count('★') or 3
+
+
+def _tags_commas(value: str) -> str:
+    tags = [t.lstrip('#') for t in value.split()]
+    return '\n' + ', '.join(tags) + '\n' if tags else value
+
+
+MUTATORS: Dict[str, Callable[[str], str]] = {
+    'layer_spaced': lambda t: re.sub(r'^\[\+?Layer:\s*(.+?)\]$', r'[ Layer : \1 ]', t, flags=re.M),
+    'layer_plain': lambda t: re.sub(r'^\[\+Layer:', '[Layer:', t, flags=re.M),
+    'title_fullwidth': lambda t: map_field(t, 'Title', lambda v: v.replace(' | ', '｜')),
+    'title_middle_dot': lambda t: map_field(t, 'Title', lambda v: v.replace(' | ', ' · ')),
+    'title_brackets': lambda t: map_field(t, 'Title', lambda v: re.sub(r'^ (.+?) \| (.+)$', r' \1（\2）', v)),
+    'weight_digit': lambda t: map_field(t, 'Weight', lambda v: f" {_star_count(v)}"),
+    'weight_spaced': lambda t: map_field(t, 'Weight', lambda v: ' ' + ' '.join('★' * _star_count(v))),
+    'weight_ascii': lambda t: map_field(t, 'Weight', lambda v: ' ' + '*' * _star_count(v)),
+    'weight_outlined': lambda t: map_field(t, 'Weight', lambda v: ' ' + '★' * _star_count(v) + '☆' * (5 - _star_count(v))),
+    'citation_registry_entry': lambda t: map_field(t, 'Citation', lambda v: v.replace('Entry ', 'Spiral Registry Entry ')),
+    'citation_angle_title': lambda t: map_field(t, 'Citation', lambda v: re.sub(r'\*([^*]+)\*', r'<\1>', v)),
+    'citation_registered_epoch': lambda t: map_field(t, 'Citation', lambda v: v.replace('Epoch', 'Registered Epoch')),
+    'citation_fullwidth': lambda t: map_field(t, 'Citation', lambda v: v.replace('．', '。').replace(':', '：')),
+    'category_fullwidth': lambda t: map_field(t, 'Category', lambda v: v.replace('/', '／')),
+    'author_tight': lambda t: map_field(t, 'Author', lambda v: v.replace(' × ', '×')),
+    'abstract_fullwidth': lambda t: map_field(t, 'Abstract', lambda v: v.replace(', ', '，').replace('.', '。')),
+    'scope_bullets': lambda t: map_field(t, 'Scope', lambda v: re.sub(r'^- ', '• ', v, flags=re.M)),
+    'tags_commas': lambda t: map_field(t, 'Tags', _tags_commas),
+}
+
+
+def load_sources(registry_dir: Path, lang: str) -> List[Tuple[str, Path]]:
+    """按 index.txt 顺序列出 (source, path)"""
+    lang_dir = registry_dir / lang
+    index_file = lang_dir / 'index.txt'
+    if not index_file.exists():
+        return []
+    with open(index_file, 'r', encoding='utf-8') as f:
+        file_list = [line.strip() for line in f if line.strip()]
+    return [(f"{lang}/{name}", lang_dir / name) for name in file_list if (lang_dir / name).exists()]
+
+
+def generate_fuzz_corpus(
+    registry_dir: Path,
+    languages: List[str],
+    target_dir: Path,
+    combos: int,
+    seed: int
+) -> List[Tuple[str, Path]]:
+    """
+    每份源 × 每个适用变体各生成一份，再加 combos 份随机组合（2–4 个变体）
+    文件名为 <源文件名>~<变体>.txt；同一 seed 生成的语料完全相同
+    """
+    seeds = []
+    for lang in languages:
+        for source, path in load_sources(registry_dir, lang):
+            seeds.append((lang, path, path.read_text(encoding='utf-8')))
+
+    variants: List[Tuple[str, str, str]] = []
+    for lang, path, text in seeds:
+        for name, mutate in MUTATORS.items():
+            variants.append((lang, f"{path.stem}~{name}.txt", mutate(text)))
+
+    rng = random.Random(seed)
+    names = sorted(MUTATORS)
+    for _ in range(combos if seeds else 0):
+        lang, path, text = rng.choice(seeds)
+        chosen = sorted(rng.sample(names, rng.randint(2, 4)))
+        for name in chosen:
+            text = MUTATORS[name](text)
+        variants.append((lang, f"{path.stem}~{'+'.join(chosen)}.txt", text))
+
+    sources = []
+    seen = set()
+    originals = {(lang, path.stem): text for lang, path, text in seeds}
+    for lang, filename, text in variants:
+        # 不适用的变体（输出与原文相同）与重复抽到的组合不计入语料
+        if text == originals[(lang, filename.split('~')[0])] or (lang, filename) in seen:
+            continue
+        seen.add((lang, filename))
+        filepath = target_dir / lang / filename
+        filepath.parent.mkdir(parents=True, exist_ok=True)
+        filepath.write_text(text, encoding='utf-8')
+        sources.append((f"{lang}/{filename}", filepath))
+    return sources
+
+
+# ============================================================================
+# 规范化输出与阶段计时
+# ============================================================================
+
+class StageTimer:
+    """临时替换 registry_build 模块中的阶段函数，累计各阶段耗时（秒）"""
+
+    def __init__(self, stages: Tuple[str, ...] = STAGES):
+        self.stages = stages
+        self.totals = {name: 0.0 for name in stages}
+        self._originals: Dict[str, Callable] = {}
+
+    def _wrap(self, name: str, fn: Callable) -> Callable:
+        def timed(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                self.totals[name] += time.perf_counter() - start
+        return timed
+
+    def __enter__(self) -> 'StageTimer':
+        for name in self.stages:
+            self._originals[name] = getattr(rb, name)
+            setattr(rb, name, self._wrap(name, self._originals[name]))
+        return self
+
+    def __exit__(self, *exc_info):
+        for name, fn in self._originals.items():
+            setattr(rb, name, fn)
+
+
+def canonical_card(card: Dict[str, Any]) -> Dict[str, Any]:
+    """去掉随构建日期变化的 origin.migrated_at"""
+    origin = {k: v for k, v in card.get('origin', {}).items() if k != 'migrated_at'}
+    return {**card, 'origin': origin}
+
+
+def run_corpus(
+    sources: List[Tuple[str, Path]],
+    fuzz: bool = False,
+    should_sanitize: bool = True
+) -> Tuple[bytes, bytes, Dict[str, float]]:
+    """
+    按生成器的解析 → 规范化 → 验证流程处理语料
+    返回 (基线内容, 完整规范化输出, 各阶段耗时)
+    fuzz：模糊语料的变体按构造共享 id，逐张单独验证；基线只记录每份源规范化输出的
+    sha256（语料体积大，按源定位差异即可）
+    """
+    entries = []
+    cards = []
+    with StageTimer() as timer:
+        for source, filepath in sources:
+            lang = source.split('/', 1)[0]
+            try:
+                card = rb.normalize_to_schema(rb.parse_txt_file(filepath, should_sanitize, lang), lang)
+            except Exception as e:
+                entries.append({'source': source, 'error': f"{type(e).__name__}: {e}"})
+                continue
+            entry = {'source': source, 'card': canonical_card(card)}
+            entries.append(entry)
+            cards.append((entry, card))
+        if fuzz:
+            results = [rb.validate_cards([card])[0] for _, card in cards]
+        else:
+            results = rb.validate_cards([card for _, card in cards])
+    for (entry, _), (errors, warnings) in zip(cards, results):
+        entry['errors'] = errors
+        entry['warnings'] = warnings
+
+    serializer = rb.JsonSerializer()
+    entries.sort(key=lambda e: e['source'])
+    start = time.perf_counter()
+    output = serializer.dumps(entries, True)
+    timer.totals['serialize'] = time.perf_counter() - start
+    if not fuzz:
+        return output, output, timer.totals
+    digests = {e['source']: hashlib.sha256(serializer.dumps(e, True)).hexdigest() for e in entries}
+    return serializer.dumps(digests, True), output, timer.totals
+
+
+def first_difference(expected: bytes, actual: bytes) -> List[str]:
+    """第一处差异附近的 unified diff（最多 DIFF_CONTEXT_LINES 行）"""
+    diff = difflib.unified_diff(
+        expected.decode('utf-8').splitlines(),
+        actual.decode('utf-8').splitlines(),
+        'golden', 'actual', lineterm=''
+    )
+    return [line for _, line in zip(range(DIFF_CONTEXT_LINES), diff)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Spiral Registry golden-output harness')
+    parser.add_argument(
+        '--registry-dir',
+        type=Path,
+        default=Path('registry'),
+        help='Registry directory (default: registry)'
+    )
+    parser.add_argument(
+        '--golden-dir',
+        type=Path,
+        default=Path(__file__).resolve().parent / 'golden',
+        help='Directory holding golden outputs (default: tools/golden)'
+    )
+    parser.add_argument(
+        '--langs',
+        nargs='+',
+        choices=rb.registered_languages(),
+        default=rb.registered_languages(),
+        help=f"Languages to check (default: all registered: {' '.join(rb.registered_languages())})"
+    )
+    parser.add_argument(
+        '--fuzz-combos',
+        type=int,
+        default=40,
+        help='Random multi-variant sources added to the fuzz corpus (default: 40)'
+    )
+    parser.add_argument(
+        '--seed',
+        type=int,
+        default=0,
+        help='Fuzz corpus seed; goldens are only comparable for the same seed (default: 0)'
+    )
+    parser.add_argument(
+        '--update',
+        action='store_true',
+        help='Rewrite golden outputs instead of comparing'
+    )
+    parser.add_argument(
+        '--actual-dir',
+        type=Path,
+        default=None,
+        help='Write actual outputs of mismatching corpora here for inspection'
+    )
+    args = parser.parse_args()
+
+    print("🜂 Spiral Registry Golden Harness")
+
+    with tempfile.TemporaryDirectory(prefix='registry-fuzz-') as fuzz_dir:
+        corpora = [(lang, load_sources(args.registry_dir, lang), False) for lang in args.langs]
+        corpora.append(('fuzz', generate_fuzz_corpus(
+            args.registry_dir, args.langs, Path(fuzz_dir), args.fuzz_combos, args.seed
+        ), True))
+
+        results = []
+        for name, sources, fuzz in corpora:
+            if not sources:
+                print(f"⚠️  Warning: no sources for {name}, skipping")
+                continue
+            golden, output, timings = run_corpus(sources, fuzz)
+            results.append((name, len(sources), golden, output, timings))
+
+    failed = False
+    print("")
+    print("| Corpus | Sources | " + " | ".join(STAGES) + " | serialize | Golden |")
+    print("|---|---|" + "---|" * (len(STAGES) + 2))
+    mismatches = []
+    for name, count, golden, output, timings in results:
+        golden_file = args.golden_dir / f"{name}.json"
+        if args.update:
+            rb.publish_files(args.golden_dir, {Path(golden_file.name): golden})
+            status = '📝 updated'
+        elif not golden_file.exists():
+            status = '❌ missing'
+            failed = True
+        elif golden_file.read_bytes() == golden:
+            status = '✅'
+        else:
+            status = '❌ differs'
+            failed = True
+            mismatches.append((name, golden_file.read_bytes(), golden, output))
+        cells = ' | '.join(f"{timings[stage] * 1000:.1f} ms" for stage in STAGES + ('serialize',))
+        print(f"| {name} | {count} | {cells} | {status} |")
+
+    for name, expected, golden, output in mismatches:
+        print("")
+        print(f"### {name}")
+        print("```diff")
+        print('\n'.join(first_difference(expected, golden)))
+        print("```")
+        if args.actual_dir is not None:
+            rb.publish_files(args.actual_dir, {Path(f"{name}.json"): output})
+            print(f"💾 Actual output written to {args.actual_dir / f'{name}.json'}")
+
+    if failed:
+        print("")
+        print("❌ Golden outputs differ (run with --update after reviewing an intended change)")
+        exit(1)
+
+
+if __name__ == '__main__':
+    main()